@@ -1,80 +1,36 @@
-from flask import Flask, render_template, jsonify, request, send_file
-import boto3
+from flask import Flask, Response, render_template, jsonify, request
 import re
 import os
 import json
 import subprocess
 import configparser
-import zipfile
+import time
+import threading
+import multiprocessing
 import pandas as pd
+from io import BytesIO
 from datetime import datetime, timezone
-from tempfile import NamedTemporaryFile
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from openpyxl.worksheet.table import Table, TableStyleInfo
-from openpyxl.styles import PatternFill, Alignment
-from openpyxl.utils import get_column_letter, quote_sheetname
-from openpyxl import load_workbook
-from modules.vpc import list_vpcs
-from modules.subnet import list_subnets
-from modules.nacl import list_nacls
-from modules.ec2 import list_ec2_instances
-from modules.asg import list_auto_scaling_groups
-from modules.elb import list_elbs
-from modules.tg import list_target_groups
-from modules.cloudfront import list_cloudfront_distributions
-from modules.s3 import list_s3_buckets
-from modules.iamrole import list_iam_roles
-from modules.db import list_db_clusters
-from modules.elasticache import list_elasticache_clusters
-from modules.msk import list_kafka_clusters
-from modules.sg import list_security_groups
-from modules.sg_detail import fetch_all_sg_data
-from modules.route53 import list_route53, fetch_route53_data, sanitize_sheet_name
-from modules.opensearch import list_opensearch_clusters
-from modules.dynamodb import list_dynamodb_tables
-from modules.eks import list_eks_clusters
-from modules.acm import list_acm_certificates
-from modules.kms import list_kms_keys
-from modules.secrets_manager import list_secrets_manager
-from modules.sqs import list_sqs_queues
-from modules.ses import list_ses_identities
-from modules.sns import list_sns_topics
-from modules.lamda import list_lambda_functions
-from openpyxl.worksheet.table import Table, TableStyleInfo
+from modules.sg_detail import SGRuleView
+from modules.route53 import sanitize_sheet_name
+from modules.exposure import list_exposure
+from modules.ip_index import build_ip_owner_index
+from modules.collection import (
+    RESOURCE_MAP, DETAIL_RESOURCE_MAP, create_session, attach_describe_cache, check_credentials,
+    run_collectors, collect_account
+)
+from modules.rate_limiter import RATE_LIMITER
+from modules.jobs import JobRegistry, JobCancelled, run_tracked
+from modules.result_cache import ResultCache
+from modules.snapshot_store import SnapshotStore
+from modules.excel_writer import StreamingExcelWriter
+from modules.exporters import EXPORT_FORMATS, available_formats, check_export_format, export_datasets, export_dataset
+from modules.zip_stream import ERRORS_NAME, stream_zip
 
 app = Flask(__name__)
 
-RESOURCE_MAP = {
-    "vpcs": list_vpcs,
-    "subnets": list_subnets,
-    "eks": list_eks_clusters,
-    "asg": list_auto_scaling_groups,
-    "ec2": list_ec2_instances,
-    "security-groups": list_security_groups,
-    "nacl": list_nacls,
-    "elbs": list_elbs,
-    "target-groups": list_target_groups,
-    "database": list_db_clusters,
-    "dynamodb": list_dynamodb_tables,
-    "elasticache": list_elasticache_clusters,
-    "msk": list_kafka_clusters,
-    "opensearch": list_opensearch_clusters,
-    "route53": list_route53,
-    "cloudfront": list_cloudfront_distributions,
-    "s3": list_s3_buckets,
-    "lamda": list_lambda_functions,
-    "acm": list_acm_certificates,
-    "kms": list_kms_keys,
-    "secrets-manager": list_secrets_manager,
-    "sqs": list_sqs_queues,
-    "ses": list_ses_identities,
-    "sns": list_sns_topics
-}
-
-DETAIL_RESOURCE_MAP = {
-    "security-groups-details": fetch_all_sg_data,
-    "route53-details": fetch_route53_data
-}
+# Background download jobs (at most two collections run at once)
+JOBS = JobRegistry(max_workers=2)
 
 REGION_LIST = [
     "us-east-1",    # N. Virginia
@@ -96,6 +52,63 @@ REGION_LIST = [
     "sa-east-1"     # São Paulo
 ]
 
+# Global services are collected once, from HOME_REGION, in all-region downloads
+GLOBAL_RESOURCES = {"route53", "cloudfront", "s3", "route53-details"}
+HOME_REGION = "us-east-1"
+ALL_REGION_WORKERS = 32
+# Download files (workbooks / export datasets) built at the same time
+EXPORT_WORKERS = 4
+
+# /api/<resource> result cache: seconds a tab stays fresh, per resource
+RESOURCE_TTLS = {
+    "ec2": 60,
+    "asg": 60,
+    "target-groups": 60,
+    "eks": 120,
+    "route53": 900,
+    "cloudfront": 900,
+    "s3": 900,
+    "acm": 900,
+    "kms": 900,
+    "ses": 900
+}
+DEFAULT_RESOURCE_TTL = 300
+RESULT_CACHE = ResultCache(
+    max_bytes=int(os.environ.get("RESULT_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+    max_stale=int(os.environ.get("RESULT_CACHE_MAX_STALE", 3600))
+)
+
+# Every collection is persisted here (in the home directory, which survives a container restart)
+SNAPSHOTS = SnapshotStore(
+    os.environ.get("SNAPSHOT_DB", os.path.join(os.path.expanduser("~"), ".aws_inventory", "snapshots.db")),
+    retention=int(os.environ.get("SNAPSHOT_RETENTION_DAYS", 7)) * 24 * 3600,
+    keep=int(os.environ.get("SNAPSHOT_KEEP", 5))
+)
+
+# /api/ip-owner: the address index of a (profile, region) is reused for this many seconds
+IP_INDEX_TTL = 300
+IP_INDEXES = {}
+IP_INDEX_LOCK = threading.Lock()
+
+# Organization sweep: one worker process per account, each with its own capped thread pool.
+# Accounts spend their time waiting on AWS, not the CPU, so this is accounts in flight, not cores;
+# every worker is a full interpreter with the collectors loaded, which keeps the default modest
+ORG_SWEEP_PROCESSES = int(os.environ.get("ORG_SWEEP_ACCOUNTS", 8))
+ACCOUNT_WORKERS = 4
+# How often a running sweep checks for finished accounts and cancellation
+SWEEP_POLL_SECONDS = 0.5
+
+def ip_owner_index(profile, region, refresh=False):
+    # Incident lookups come in bursts: build the index once and reuse it for IP_INDEX_TTL seconds
+    with IP_INDEX_LOCK:
+        cached = IP_INDEXES.get((profile, region))
+    if cached and not refresh and time.time() - cached[0] < IP_INDEX_TTL:
+        return cached
+    built = (time.time(), build_ip_owner_index(attach_describe_cache(create_session(profile, region))))
+    with IP_INDEX_LOCK:
+        IP_INDEXES[(profile, region)] = built
+    return built
+
 def get_aws_profiles(config_path="~/.aws/config"):
     profiles = []
     path = os.path.expanduser(config_path)
@@ -161,147 +174,253 @@ def has_valid_sso_token(config_path="~/.aws/config", cache_dir="~/.aws/sso/cache
     return False  # no valid session
 
 def save_excel_with_format(sheet_dict, filename):
-    def sanitize_datetime(df):
-        for col in df.select_dtypes(include=['datetimetz', 'datetime64[ns, UTC]']):
-            df[col] = df[col].dt.tz_localize(None)
-        return df
-
-    with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-        for sheet_name, df in sheet_dict.items():
-            df = sanitize_datetime(pd.DataFrame(df))
-            df.to_excel(writer, sheet_name=sheet_name[:31], index=False)
-
-    wb = load_workbook(filename)
-    header_fill = PatternFill(start_color='FFFFCC', end_color='FFFFCC', fill_type='solid')
-
-    for sheet in wb.sheetnames:
-        ws = wb[sheet]
-
-        # Header style
-        for cell in ws[1]:
-            cell.fill = header_fill
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-
-        # Column width auto adjust + center alignment
-        for col in ws.columns:
-            max_length = max((len(str(cell.value)) for cell in col if cell.value), default=0) + 2
-            ws.column_dimensions[get_column_letter(col[0].column)].width = max_length
-            for cell in col:
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-
-        # Create a Table
-        if ws.max_row > 1 and ws.max_column > 0:
-            table_range = f"A1:{get_column_letter(ws.max_column)}{ws.max_row}"
-            safe_table_name = f"{sheet.replace(' ', '_').replace('-', '_')}_Table"
-            table = Table(displayName=safe_table_name[:30], ref=table_range)
-            style = TableStyleInfo(name="TableStyleMedium9", showFirstColumn=False,
-                                   showLastColumn=False, showRowStripes=False, showColumnStripes=False)
-            table.tableStyleInfo = style
-            ws.add_table(table)
-
-    # Hosted Zones → Hyperlink to other sheets
-    if "Hosted Zones" in wb.sheetnames:
-        summary_ws = wb["Hosted Zones"]
-        for row in summary_ws.iter_rows(min_row=2, max_col=1):
-            cell = row[0]
-            zone_name = str(cell.value).rstrip('.')
-            target_sheet = sanitize_sheet_name(zone_name)[:31]
-            if target_sheet in wb.sheetnames:
-                cell.hyperlink = f"#{quote_sheetname(target_sheet)}!A1"
-                cell.style = "Hyperlink"
-
-    # Add each Zone sheet → Hosted Zones hyperlink
-    for sheet in wb.sheetnames:
-        if sheet == "Hosted Zones":
-            continue
-        ws = wb[sheet]
-        last_row = ws.max_row + 2
+    writer = StreamingExcelWriter(filename)
+    sheet_names = {sheet_name[:31] for sheet_name in sheet_dict}
+
+    def zone_sheet(zone_name):
+        # Hosted Zones → Hyperlink to other sheets
+        target_sheet = sanitize_sheet_name(str(zone_name).rstrip('.'))[:31]
+        return target_sheet if target_sheet in sheet_names else None
+
+    for sheet_name, df in sheet_dict.items():
+        if sheet_name == "Hosted Zones":
+            df = pd.DataFrame(df)
+            links = {df.columns[0]: zone_sheet} if len(df.columns) else {}
+            writer.add_sheet(sheet_name, df, table=True, links=links)
+        else:
+            # Add each Zone sheet → Hosted Zones hyperlink
+            writer.add_sheet(sheet_name, df, table=True, footer_link="Hosted Zones")
 
-        # Merge & Write Text
-        max_col = ws.max_column
-        ws.merge_cells(start_row=last_row, start_column=1, end_row=last_row, end_column=max_col)
+    writer.save()
 
-        cell = ws.cell(row=last_row, column=1)
-        cell.value = "Go to Hosted Zones"
-        cell.hyperlink = f"#{quote_sheetname('Hosted Zones')}!A1"
-        cell.style = "Hyperlink"
+def snapshot_region(resource, region):
+    # Global services return the same data from every region
+    return "global" if resource in GLOBAL_RESOURCES else region
 
-        # Background color & Alignment
-        cell.fill = PatternFill(start_color='FFE5E5', end_color='FFE5E5', fill_type='solid')
-        cell.alignment = Alignment(horizontal='center', vertical='center')
+def save_snapshot(profile, region, resource, result):
+    # Results of a collection whose credentials were checked, empty ones included (the last resource may be gone)
+    try:
+        SNAPSHOTS.save(profile, snapshot_region(resource, region), resource, result)
+    except Exception as e:
+        print(f"[ERROR] Saving {resource} snapshot failed: {e}")
+
+def parallel_execute(resource_map, session, max_workers=10, job=None):
+    def on_result(session, key, result):
+        save_snapshot(session.profile_name, session.region_name, key, result)
 
-    wb.save(filename)
+    return run_collectors(resource_map, session, max_workers=max_workers, job=job, on_result=on_result)
+
+def get_enabled_regions(session):
+    # describe_regions only returns regions enabled for the account
+    try:
+        enabled = {r['RegionName'] for r in session.client('ec2').describe_regions()['Regions']}
+        return [region for region in REGION_LIST if region in enabled]
+    except Exception as e:
+        print(f"[WARN] Failed to check enabled regions, using all regions: {e}")
+        return list(REGION_LIST)
+
+def parallel_execute_regions(resource_map, sessions, job=None):
+    # Every (region, collector) pair shares one bounded pool
+    if sessions:
+        # One profile: its credentials are checked once
+        check_credentials(next(iter(sessions.values())))
+    results = {key: {} for key in resource_map}
+    with ThreadPoolExecutor(max_workers=ALL_REGION_WORKERS) as executor:
+        futures = {}
+        for region, session in sessions.items():
+            attach_describe_cache(session)
+            for key, func in resource_map.items():
+                if key in GLOBAL_RESOURCES and region != HOME_REGION:
+                    continue
+                futures[executor.submit(run_tracked, job, f"{region}/{key}", func, session)] = (region, key)
 
-def parallel_execute(resource_map, session):
-    results = {}
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = {executor.submit(func, session): key for key, func in resource_map.items()}
         for future in as_completed(futures):
-            key = futures[future]
+            region, key = futures[future]
             try:
-                results[key] = future.result()
+                results[key][region] = future.result()
+                save_snapshot(sessions[region].profile_name, region, key, results[key][region])
+            except JobCancelled:
+                results[key][region] = []
             except Exception as e:
-                print(f"[ERROR] {key} failed: {e}")
-                results[key] = []
+                print(f"[ERROR] {region} {key} failed: {e}")
+                results[key][region] = []
     return results
 
-def save_excel_from_data(data_dict, sheet_order):
-    
-    def sanitize_datetime(df):
-        for col in df.select_dtypes(include=['datetime64[ns, UTC]', 'datetimetz']):
-            df[col] = df[col].dt.tz_localize(None)
-        return df
-    
-    def workbook_with_format(file_name_with_dir):
-        try:
-            workbook = load_workbook(file_name_with_dir)
-            header_fill = PatternFill(start_color='FFFFCC', end_color='FFFFCC', fill_type='solid')
-            for sheet_name in workbook.sheetnames:
-                worksheet = workbook[sheet_name]
-                for cell in worksheet[1]:
-                    cell.fill = header_fill
-                    cell.alignment = Alignment(horizontal='center', vertical='center')
-                worksheet.auto_filter.ref = worksheet.dimensions
-                for column in worksheet.columns:
-                    max_length = max(len(str(cell.value)) for cell in column if cell.value) + 2
-                    column_letter = get_column_letter(column[0].column)
-                    worksheet.column_dimensions[column_letter].width = max_length
-                    for cell in column:
-                        cell.alignment = Alignment(horizontal='center', vertical='center')
-            workbook.save(file_name_with_dir)
-        except Exception as e:
-            print(f"Error formatting workbook: {e}")
-
-    with NamedTemporaryFile(delete=False, suffix=".xlsx") as tmp:
-        with pd.ExcelWriter(tmp.name, engine='openpyxl') as writer:
-            sheet_written = False
-            for sheet_name in sheet_order:
-                if sheet_name not in data_dict:
-                    continue
-                data = data_dict[sheet_name]
-
-                if isinstance(data, tuple):
-                    sub_sheets = ["Summary", "Details", "Findings"]
-                    for sub_sheet, df in zip(sub_sheets, data):
-                        df = sanitize_datetime(pd.DataFrame(df))
-                        if df.empty:
-                            print(f"[WARNING] Sheet {sheet_name}-{sub_sheet} has no data, skipping.")
-                            continue
-                        sheet_written = True
-                        df.to_excel(writer, sheet_name=sub_sheet, index=False)
+def merge_results(labeled_results, column):
+    # {key: [(label, data), ...]} -> one dataset per key, rows tagged with `column`
+    def with_label(data, label):
+        if isinstance(data, SGRuleView):
+            return data.labeled(column, label)
+        if isinstance(data, pd.DataFrame):
+            if column not in data.columns:
+                data = data.copy()
+                data.insert(0, column, label)
+            return data
+        return [row if column in row else {column: label, **row} for row in data]
+
+    merged = {}
+    for key, labeled in labeled_results.items():
+        parts = [(label, data) for label, data in labeled if len(data)]
+
+        if not parts:
+            merged[key] = []
+        elif isinstance(parts[0][1], dict):
+            # Route53 detail sheets: merge same-named sheets, keeping the zone name in column A for hyperlinks
+            if len(parts) == 1:
+                merged[key] = parts[0][1]
+                continue
+            sheets = {}
+            for label, data in parts:
+                for sheet_name, df in data.items():
+                    if not df.empty:
+                        sheets.setdefault(sheet_name, []).append(df.assign(**{column: label}))
+            merged[key] = {sheet_name: pd.concat(frames, ignore_index=True) for sheet_name, frames in sheets.items()}
+        elif isinstance(parts[0][1], tuple):
+            # SG details: merge Summary / Details / Findings sheet by sheet
+            sheets = []
+            for index in range(len(parts[0][1])):
+                frames = [with_label(data[index], label) for label, data in parts
+                          if isinstance(data[index], (pd.DataFrame, SGRuleView)) and not data[index].empty]
+                if frames and isinstance(frames[0], SGRuleView):
+                    # Details stay normalized across regions / profiles too
+                    sheets.append(SGRuleView.concat(frames))
                 else:
-                    df = sanitize_datetime(pd.DataFrame(data))
-                    if df.empty:
-                        print(f"[WARNING] Sheet {sheet_name} has no data, skipping.")
-                        continue
-                    sheet_written = True
-                    df.to_excel(writer, sheet_name=sheet_name, index=False)
+                    sheets.append(pd.concat(frames, ignore_index=True) if frames else pd.DataFrame())
+            merged[key] = tuple(sheets)
+        else:
+            merged[key] = [row for label, data in parts for row in with_label(data, label)]
+    return merged
+
+def merge_region_results(region_results):
+    labeled_results = {
+        key: [("global" if key in GLOBAL_RESOURCES else region, by_region[region])
+              for region in sorted(by_region, key=REGION_LIST.index)]
+        for key, by_region in region_results.items()
+    }
+    return merge_results(labeled_results, "Region")
+
+def sweep_profiles(profiles, region, job=None):
+    labeled_results = {key: [] for key in {**RESOURCE_MAP, **DETAIL_RESOURCE_MAP}}
+    context = multiprocessing.get_context('spawn')
+    # Leaving the pool terminates its workers, so a cancelled sweep does not wait for running accounts
+    with context.Pool(processes=ORG_SWEEP_PROCESSES) as pool:
+        # Workers only import modules.collection (see main.py); snapshots are saved here, in one process
+        pending = {pool.apply_async(collect_account, (profile, region, ACCOUNT_WORKERS)): profile for profile in profiles}
+        done = 0
+        while pending:
+            if job is not None and job.cancelled:
+                raise JobCancelled()
+            finished = [result for result in pending if result.ready()]
+            if not finished:
+                time.sleep(SWEEP_POLL_SECONDS)
+                continue
+            for result in finished:
+                profile = pending.pop(result)
+                done += 1
+                try:
+                    seconds, results = result.get()
+                except Exception as e:
+                    print(f"[ERROR] {profile} sweep failed: {e}")
+                    if job is not None:
+                        job.update_task(profile, 'failed')
+                    continue
+                if job is not None:
+                    job.update_task(profile, 'done', seconds)
+                # Roll each account up as soon as its process finishes
+                print(f"[INFO] {profile} collected ({done}/{len(profiles)})")
+                for key, data in results.items():
+                    save_snapshot(profile, region, key, data)
+                    labeled_results[key].append((profile, data))
+
+    for key in labeled_results:
+        labeled_results[key].sort(key=lambda part: part[0])
+    return merge_results(labeled_results, "Profile")
+
+def save_excel_from_data(data_dict, sheet_order, filename):
+    writer = StreamingExcelWriter(filename)
+    for sheet_name in sheet_order:
+        if sheet_name not in data_dict:
+            continue
+        data = data_dict[sheet_name]
+
+        if isinstance(data, tuple):
+            sub_sheets = ["Summary", "Details", "Findings"]
+            for sub_sheet, df in zip(sub_sheets, data):
+                # The SG Details rule view is expanded here, just for its sheet
+                df = df.to_frame() if isinstance(df, SGRuleView) else pd.DataFrame(df)
+                if df.empty:
+                    print(f"[WARNING] Sheet {sheet_name}-{sub_sheet} has no data, skipping.")
+                    continue
+                writer.add_sheet(sub_sheet, df, auto_filter=True)
+        else:
+            df = pd.DataFrame(data)
+            if df.empty:
+                print(f"[WARNING] Sheet {sheet_name} has no data, skipping.")
+                continue
+            writer.add_sheet(sheet_name, df, auto_filter=True)
+
+    if not writer.sheet_names:
+        print("[WARNING] No sheets written. Excel file will be empty.")
+    return writer.save()
+
+@app.route('/api/rate-limits')
+def get_rate_limits():
+    rows = RATE_LIMITER.snapshot()
+    if not rows:
+        return jsonify({"columns": [], "rows": []})
+    return jsonify({"columns": list(rows[0].keys()), "rows": [list(row.values()) for row in rows]})
+
+@app.route('/api/cache')
+def get_cache_stats():
+    return jsonify(RESULT_CACHE.stats())
+
+@app.route('/api/exposure')
+def get_exposure():
+    # ENIs reachable from the internet through SG, NACL and routing layers, e.g. ?ports=22,3389&protocol=tcp
+    profile = request.args.get("profile", "sightmind-prod")
+    region = request.args.get("region", "us-east-1")
+    started = time.monotonic()
+    try:
+        session = attach_describe_cache(create_session(profile, region))
+        rows = list_exposure(session, ports=request.args.get("ports"), protocol=request.args.get("protocol", "tcp"),
+                             source=request.args.get("source"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-            if not sheet_written:
-                print("[WARNING] No sheets written. Excel file will be empty.")
+    elapsed_ms = round((time.monotonic() - started) * 1000, 1)
+    if not rows:
+        return jsonify({"columns": [], "rows": [], "elapsed_ms": elapsed_ms})
+    return jsonify({"columns": list(rows[0].keys()), "rows": [list(row.values()) for row in rows], "elapsed_ms": elapsed_ms})
 
-        workbook_with_format(tmp.name)
-        return tmp.name
+@app.route('/api/ip-owner', methods=['GET', 'POST'])
+def get_ip_owner():
+    # ?ip=10.0.1.5,10.0.2.7 or POST {"ips": [...]} / a plain text body with one address per line (e.g. from flow logs)
+    profile = request.args.get("profile", "sightmind-prod")
+    region = request.args.get("region", "us-east-1")
+    refresh = request.args.get("refresh") == "1"
+
+    if request.method == 'POST':
+        payload = request.get_json(silent=True)
+        if isinstance(payload, dict):
+            payload = payload.get("ips", [])
+        addresses = payload if isinstance(payload, list) else re.split(r'[\s,]+', request.get_data(as_text=True))
+    else:
+        addresses = request.args.get("ip", "").split(",")
+    if not any(str(address).strip() for address in addresses):
+        return jsonify({"error": "ip is required"}), 400
+
+    try:
+        indexed_at, index = ip_owner_index(profile, region, refresh)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    started = time.monotonic()
+    rows = index.lookup_many(addresses)
+    elapsed_ms = round((time.monotonic() - started) * 1000, 1)
+    return jsonify({"columns": list(rows[0].keys()) if rows else [], "rows": [list(row.values()) for row in rows],
+                    "indexed_at": indexed_at, "elapsed_ms": elapsed_ms})
 
 @app.route('/api/<resource>')
 def get_resource(resource):
@@ -310,39 +429,65 @@ def get_resource(resource):
 
     profile = request.args.get("profile", "sightmind-prod")
     region = request.args.get("region", "us-east-1")
-    try:
-        session = boto3.Session(profile_name=profile, region_name=region)
-        result = RESOURCE_MAP[resource](session)
-        print(f"[DEBUG] {resource} result: {result}")
+    refresh = request.args.get("refresh") == "1"
+    # full=1 also re-runs per-resource enrichment of unchanged resources
+    full_refresh = request.args.get("full") == "1"
+
+    def to_payload(result):
         if not result:
-            return jsonify({"columns": [], "rows": []})
-        
+            return {"columns": [], "rows": []}
+
         columns = list(result[0].keys())
         rows = [list(item.values()) for item in result]
-        return jsonify({"columns": columns, "rows": rows})
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
-@app.route('/download/selected')
-def selected_region_download():
-    profile = request.args.get("profile")
-    region = request.args.get("region")
-    if not profile or not region:
-        return "Profile & Region is required", 400
+        return {"columns": columns, "rows": rows}
 
+    def load():
+        session = create_session(profile, region, full_refresh=full_refresh)
+        # An expired session raises here, so the cached / snapshot result is kept
+        check_credentials(session)
+        result = RESOURCE_MAP[resource](session)
+        print(f"[DEBUG] {resource} result: {result}")
+        save_snapshot(profile, region, resource, result)
+        return to_payload(result)
+
+    def last_snapshot():
+        # After a restart the cache is empty: show the last snapshot while AWS is queried
+        snapshot = SNAPSHOTS.latest(profile, snapshot_region(resource, region), resource)
+        if snapshot is None:
+            return None
+        result, collected_at = snapshot
+        return to_payload(result), collected_at
+
+    cache_key = (profile, snapshot_region(resource, region), resource)
     try:
-        session = boto3.Session(profile_name=profile, region_name=region)
-
-        # Collect Data
-        inventory_data = parallel_execute(RESOURCE_MAP, session)
-        detail_data = parallel_execute(DETAIL_RESOURCE_MAP, session)
-
-        excel_files = []
+        payload, fetched_at, stale = RESULT_CACHE.get(
+            cache_key, RESOURCE_TTLS.get(resource, DEFAULT_RESOURCE_TTL), load,
+            refresh=refresh or full_refresh, fallback=last_snapshot)
+        return jsonify({**payload, "fetched_at": fetched_at, "stale": stale})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
+def render_member(build):
+    # Build one download file in memory; None when there was nothing to write
+    output = BytesIO()
+    if build(output) is False:
+        return None
+    return output.getvalue()
+
+def inventory_members(profile, inventory_data, detail_data, export_format="xlsx"):
+    builders = []
+
+    if export_format != "xlsx":
+        # One machine-readable file per dataset instead of the formatted workbooks
+        extension = EXPORT_FORMATS[export_format]
+        for name, data in export_datasets(inventory_data, detail_data):
+            builders.append((f"{profile}_{name}.{extension}",
+                             lambda output, data=data: export_dataset(data, output, export_format)))
+    else:
         # # Inventory Excel
         if any(inventory_data.values()):
-            inventory_excel = save_excel_from_data(inventory_data, sheet_order=list(RESOURCE_MAP.keys()))
-            excel_files.append((inventory_excel, f"{profile}_inventory.xlsx"))
+            builders.append((f"{profile}_inventory.xlsx",
+                             lambda output: save_excel_from_data(inventory_data, list(RESOURCE_MAP.keys()), output)))
         else:
             print("[INFO] No Inventory data found. Skipping Inventory Excel.")
 
@@ -350,8 +495,8 @@ def selected_region_download():
         sg_raw = detail_data.get("security-groups-details", [])
         if sg_raw:
             sg_data = {"security-groups-details": sg_raw}
-            sg_excel = save_excel_from_data(sg_data, sheet_order=["security-groups-details"])
-            excel_files.append((sg_excel, f"{profile}_detail_sg.xlsx"))
+            builders.append((f"{profile}_detail_sg.xlsx",
+                             lambda output: save_excel_from_data(sg_data, ["security-groups-details"], output)))
         else:
             print("[INFO] No Security Group data found. Skipping SG Excel.")
 
@@ -360,29 +505,213 @@ def selected_region_download():
         has_route53_data = any(not df.empty for df in route53_data.values()) if route53_data else False
 
         if has_route53_data:
-            with NamedTemporaryFile(delete=False, suffix=".xlsx") as route53_tmp:
-                save_excel_with_format(route53_data, route53_tmp.name)
-                excel_files.append((route53_tmp.name, f"{profile}_route53.xlsx"))
+            builders.append((f"{profile}_route53.xlsx",
+                             lambda output: save_excel_with_format(route53_data, output)))
         else:
             print("[INFO] No Route53 data found in any sheet. Skipping Route53 Excel.")
 
-        # ZIP Compression
-        with NamedTemporaryFile(delete=False, suffix=".zip") as tmp_zip:
-            with zipfile.ZipFile(tmp_zip.name, 'w') as zipf:
-                if not excel_files:
-                    print("[WARNING] No Excel files generated. Returning empty zip.")
-                for file_path, arc_name in excel_files:
-                    zipf.write(file_path, arcname=arc_name)
+    if not builders:
+        print("[WARNING] No Excel files generated. Returning empty zip.")
+
+    # Files are built concurrently and handed out in the order they finish
+    errors = []
+    with ThreadPoolExecutor(max_workers=EXPORT_WORKERS) as executor:
+        futures = {executor.submit(render_member, build): arc_name for arc_name, build in builders}
+        for future in as_completed(futures):
+            try:
+                data = future.result()
+            except Exception as e:
+                # One broken file must not cut off the archive: skip it and list it in ERRORS.txt
+                print(f"[ERROR] Building {futures[future]} failed: {e}")
+                errors.append(f"{futures[future]}: {e}")
+                continue
+            if data is not None:
+                yield futures[future], data
+    if errors:
+        yield ERRORS_NAME, "\n".join(errors) + "\n"
+
+def collect_selected_region(profile, region, job=None):
+    session = create_session(profile, region)
+    inventory_data = parallel_execute(RESOURCE_MAP, session, job=job)
+    detail_data = parallel_execute(DETAIL_RESOURCE_MAP, session, job=job)
+    return profile, inventory_data, detail_data, f"{profile}_aws_inventory_{datetime.now().strftime('%y_%m_%d')}.zip"
+
+def collect_all_regions(profile, job=None):
+    regions = get_enabled_regions(create_session(profile, HOME_REGION))
+    sessions = {region: create_session(profile, region) for region in regions}
+
+    # Inventory and detail collectors share one pool
+    collected = merge_region_results(parallel_execute_regions({**RESOURCE_MAP, **DETAIL_RESOURCE_MAP}, sessions, job=job))
+    inventory_data = {key: collected[key] for key in RESOURCE_MAP}
+    detail_data = {key: collected[key] for key in DETAIL_RESOURCE_MAP}
+    return profile, inventory_data, detail_data, f"{profile}_aws_inventory_all_regions_{datetime.now().strftime('%y_%m_%d')}.zip"
+
+def collect_organization(region, job=None):
+    profiles = get_aws_profiles()
+    if not profiles:
+        raise ValueError("No AWS profiles found")
+    for profile in profiles:
+        if job is not None:
+            job.update_task(profile, 'queued')
+
+    collected = sweep_profiles(profiles, region, job=job)
+    inventory_data = {key: collected[key] for key in RESOURCE_MAP}
+    detail_data = {key: collected[key] for key in DETAIL_RESOURCE_MAP}
+    return "organization", inventory_data, detail_data, f"organization_{region}_aws_inventory_{datetime.now().strftime('%y_%m_%d')}.zip"
+
+def collect_snapshot(profile, region, job=None):
+    # Latest stored snapshot of every resource, without calling AWS
+    def latest(key):
+        snapshot = SNAPSHOTS.latest(profile, snapshot_region(key, region), key)
+        return snapshot[0] if snapshot else []
+
+    inventory_data = {key: latest(key) for key in RESOURCE_MAP}
+    detail_data = {key: latest(key) for key in DETAIL_RESOURCE_MAP}
+    if not any(inventory_data.values()) and not any(detail_data.values()):
+        raise ValueError(f"No snapshot found for {profile} / {region}")
+    return profile, inventory_data, detail_data, f"{profile}_aws_inventory_snapshot_{datetime.now().strftime('%y_%m_%d')}.zip"
+
+# mode -> (collect function, required query parameters)
+DOWNLOAD_MODES = {
+    "selected": (collect_selected_region, ("profile", "region")),
+    "snapshot": (collect_snapshot, ("profile", "region")),
+    "all": (collect_all_regions, ("profile",)),
+    "org": (collect_organization, ("region",))
+}
+
+def requested_export_format():
+    # Checked before anything is collected, so a bad format is a 400 and not a failed download
+    export_format = request.args.get("format", "xlsx")
+    if export_format != "xlsx":
+        check_export_format(export_format)
+    return export_format
+
+def zip_response(members, download_name):
+    # Each file is deflated into the response as soon as it is built; nothing is staged on disk
+    return Response(stream_zip(members), mimetype="application/zip",
+                    headers={"Content-Disposition": f"attachment; filename={download_name}"})
+
+def export_inventory(export_format, profile, inventory_data, detail_data, download_name):
+    return zip_response(inventory_members(profile, inventory_data, detail_data, export_format), download_name)
+
+@app.route('/download/selected')
+def selected_region_download():
+    profile = request.args.get("profile")
+    region = request.args.get("region")
+    if not profile or not region:
+        return "Profile & Region is required", 400
+    try:
+        export_format = requested_export_format()
+    except ValueError as e:
+        return str(e), 400
+
+    try:
+        return export_inventory(export_format, *collect_selected_region(profile, region))
+    except Exception as e:
+        return str(e), 500
+
+@app.route('/download/snapshot')
+def snapshot_download():
+    profile = request.args.get("profile")
+    region = request.args.get("region")
+    if not profile or not region:
+        return "Profile & Region is required", 400
+    try:
+        export_format = requested_export_format()
+    except ValueError as e:
+        return str(e), 400
 
-        # Delete temporary Excel file
-        for file_path, _ in excel_files:
-            os.remove(file_path)
+    try:
+        return export_inventory(export_format, *collect_snapshot(profile, region))
+    except Exception as e:
+        return str(e), 500
 
-        return send_file(tmp_zip.name, download_name=f"{profile}_aws_inventory_{datetime.now().strftime('%y_%m_%d')}.zip", as_attachment=True)
+@app.route('/download/all')
+def all_region_download():
+    profile = request.args.get("profile")
+    if not profile:
+        return "Profile is required", 400
+    try:
+        export_format = requested_export_format()
+    except ValueError as e:
+        return str(e), 400
 
+    try:
+        return export_inventory(export_format, *collect_all_regions(profile))
     except Exception as e:
         return str(e), 500
 
+@app.route('/download/org')
+def organization_download():
+    region = request.args.get("region")
+    if not region:
+        return "Region is required", 400
+    try:
+        export_format = requested_export_format()
+    except ValueError as e:
+        return str(e), 400
+
+    try:
+        return export_inventory(export_format, *collect_organization(region))
+    except Exception as e:
+        return str(e), 500
+
+@app.route('/jobs/download/<mode>', methods=['POST'])
+def submit_download_job(mode):
+    if mode not in DOWNLOAD_MODES:
+        return jsonify({"error": "Unsupported download mode"}), 404
+
+    collect, required = DOWNLOAD_MODES[mode]
+    params = {name: request.args.get(name) for name in required}
+    missing = [name for name, value in params.items() if not value]
+    if missing:
+        return jsonify({"error": f"{', '.join(missing)} is required"}), 400
+
+    try:
+        export_format = requested_export_format()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    def runner(job):
+        profile, inventory_data, detail_data, download_name = collect(**params, job=job)
+        job.check_cancelled()
+        # The artifact is the collected data: files are rendered and zipped into the download response
+        return (lambda: inventory_members(profile, inventory_data, detail_data, export_format)), download_name
+
+    job = JOBS.submit(mode, params, runner)
+    return jsonify({"job_id": job.id, "status_url": f"/jobs/{job.id}"}), 202
+
+@app.route('/jobs/<job_id>')
+def get_download_job(job_id):
+    job = JOBS.get(job_id)
+    if not job:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/jobs/<job_id>/artifact')
+def get_download_job_artifact(job_id):
+    job = JOBS.get(job_id)
+    if not job:
+        return jsonify({"error": "Unknown job"}), 404
+    if job.status != 'done':
+        return jsonify({"error": f"Job is {job.status}"}), 409
+    members, download_name = job.artifact
+
+    def members_then_release():
+        # Released only when the whole archive was produced, so an interrupted download can be retried
+        yield from members()
+        JOBS.release(job)
+
+    return zip_response(members_then_release(), download_name)
+
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_download_job(job_id):
+    job = JOBS.get(job_id)
+    if not job:
+        return jsonify({"error": "Unknown job"}), 404
+    job.cancel()
+    return jsonify(job.to_dict())
+
 @app.route('/')
 def index():
     profiles = get_aws_profiles()
@@ -391,7 +720,14 @@ def index():
                             profile_len=len(profiles),
                             sso_valid=has_valid_sso_token(),
                             region_list=REGION_LIST,
+                            export_formats=available_formats(),
                         )
 
+def run():
+    SNAPSHOTS.compact()
+    app.run(debug=True, host='0.0.0.0', port=5000)
+
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # main.py is the entry point; running this file directly still works, but sweep workers then re-import it
+    multiprocessing.freeze_support()
+    run()
\ No newline at end of file
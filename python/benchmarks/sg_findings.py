@@ -0,0 +1,343 @@
+"""Benchmark the SG detail pipeline against the previous row-wise implementation.
+
+Builds a synthetic account (security groups with CIDR and SG-reference rules,
+ENIs attached to most groups) and times both findings engines, checking that
+the findings are identical. ``--shared`` instead measures peak memory of the
+old dict expansion against the normalized rule view for one security group
+shared by many ENIs, and checks that the expanded Details rows match.
+Before either, a handful of hand-written rules (port ranges around 22,
+all-protocol, ICMP and prefix-list rules) are checked against their expected
+findings, since the legacy engine only agrees on ranges starting at 22.
+
+    cd python && python -m benchmarks.sg_findings --groups 200 400 800
+    cd python && python -m benchmarks.sg_findings --shared 2000 --rules 40
+"""
+import re
+import time
+import tracemalloc
+import random
+import argparse
+import pandas as pd
+from modules.sg_detail import map_sg_rules_with_resources, findings_rules_with_governance
+from modules.attachment_index import AttachmentIndex, infer_resource_type
+
+def synthetic_account(groups, rules_per_group=6, enis_per_group=3, seed=7):
+    rng = random.Random(seed)
+    group_ids = [f"sg-{index:08x}" for index in range(groups)]
+
+    def permission(peer):
+        protocol = rng.choice(['tcp', 'udp', '-1'])
+        port = rng.choice([22, 80, 443, 5432, 8080])
+        rule = {'IpProtocol': protocol, 'FromPort': port, 'ToPort': port if rng.random() < 0.8 else port + 10}
+        if protocol == '-1':  # AWS omits ports on all-protocol rules
+            del rule['FromPort'], rule['ToPort']
+        if peer.startswith('sg-'):
+            rule['UserIdGroupPairs'] = [{'GroupId': peer, 'Description': 'peer'}]
+        else:
+            rule['IpRanges'] = [{'CidrIp': peer, 'Description': 'cidr'}]
+        return rule
+
+    def peers():
+        # Mostly SG references, some public and private CIDRs
+        return [rng.choice(group_ids) if rng.random() < 0.6 else rng.choice(['0.0.0.0/0', '10.0.0.0/8', '172.16.0.0/12'])
+                for _ in range(rules_per_group)]
+
+    security_groups = [{
+        'GroupId': group_id,
+        'GroupName': f"group-{group_id}",
+        'Description': 'synthetic',
+        'IpPermissions': [permission(peer) for peer in peers()],
+        'IpPermissionsEgress': [permission(peer) for peer in peers()]
+    } for group_id in group_ids]
+
+    network_interfaces = []
+    for group_id in group_ids[:int(groups * 0.9)]:  # the rest stay unused
+        for _ in range(enis_per_group):
+            network_interfaces.append({
+                'NetworkInterfaceId': f"eni-{len(network_interfaces):08x}",
+                'PrivateIpAddress': f"10.0.{len(network_interfaces) // 250}.{len(network_interfaces) % 250}",
+                'Description': '',
+                'InterfaceType': 'interface',
+                'Attachment': {'InstanceId': f"i-{len(network_interfaces):08x}"},
+                'Groups': [{'GroupId': group_id}]
+            })
+
+    return {'SecurityGroups': security_groups}, {'NetworkInterfaces': network_interfaces}
+
+def shared_account(enis, rules):
+    # One security group (e.g. a shared-VPC default group) attached to every ENI
+    rng = random.Random(7)
+    permissions = [{'IpProtocol': 'tcp', 'FromPort': 1000 + index, 'ToPort': 1000 + index,
+                    'IpRanges': [{'CidrIp': f"10.{index}.0.0/16", 'Description': rng.choice(['app', 'ops'])}]}
+                   for index in range(rules)]
+    security_groups = [{
+        'GroupId': 'sg-shared', 'GroupName': 'shared', 'Description': 'shared across the VPC',
+        'IpPermissions': permissions[:rules // 2], 'IpPermissionsEgress': permissions[rules // 2:]
+    }]
+    network_interfaces = [{
+        'NetworkInterfaceId': f"eni-{index:08x}", 'PrivateIpAddress': f"10.1.{index // 250}.{index % 250}",
+        'Description': '', 'InterfaceType': 'interface',
+        'Attachment': {'InstanceId': f"i-{index:08x}"}, 'Groups': [{'GroupId': 'sg-shared'}]
+    } for index in range(enis)]
+    return {'SecurityGroups': security_groups}, {'NetworkInterfaces': network_interfaces}
+
+# (rule, expected Rule 1 finding) on one attached group; the Description names the case
+RULE_CASES = [
+    ({'IpProtocol': 'tcp', 'FromPort': 22, 'ToPort': 22, 'CidrIpv4': '0.0.0.0/0', 'Description': 'ssh'},
+     "Inbound 0.0.0.0/0 open (22/ALL)"),
+    ({'IpProtocol': 'tcp', 'FromPort': 0, 'ToPort': 1024, 'CidrIpv4': '0.0.0.0/1', 'Description': 'range covering 22'},
+     "Inbound 0.0.0.0/1 open (22/ALL)"),
+    ({'IpProtocol': 'tcp', 'FromPort': 23, 'ToPort': 80, 'CidrIpv4': '0.0.0.0/0', 'Description': 'range above 22'}, ""),
+    ({'IpProtocol': 'tcp', 'FromPort': 22, 'ToPort': 22, 'CidrIpv4': '10.0.0.0/8', 'Description': 'private ssh'}, ""),
+    ({'IpProtocol': '-1', 'CidrIpv6': '::/0', 'Description': 'all traffic'}, "Inbound ::/0 open (22/ALL)"),
+    ({'IpProtocol': 'icmp', 'FromPort': -1, 'ToPort': -1, 'CidrIpv4': '0.0.0.0/0', 'Description': 'icmp'}, ""),
+    ({'IpProtocol': '50', 'CidrIpv4': '0.0.0.0/0', 'Description': 'esp'}, ""),
+    ({'IpProtocol': 'tcp', 'FromPort': 22, 'ToPort': 22, 'PrefixListId': 'pl-0123456789abcdef0',
+      'Description': 'prefix list ssh'}, ""),
+    ({'IpProtocol': '-1', 'IsEgress': True, 'CidrIpv4': '0.0.0.0/0', 'Description': 'all egress'},
+     "Outbound 0.0.0.0/0 open (ALL)"),
+    ({'IpProtocol': '-1', 'IsEgress': True, 'PrefixListId': 'pl-0123456789abcdef0',
+      'Description': 'prefix list egress'}, ""),
+]
+
+def check_rule_cases():
+    sg_data = {'SecurityGroups': [{'GroupId': 'sg-cases', 'GroupName': 'cases', 'Description': 'cases'}]}
+    rule_data = {'SecurityGroupRules': [{'GroupId': 'sg-cases', 'IsEgress': False, **rule} for rule, _ in RULE_CASES]}
+    eni_data = {'NetworkInterfaces': [{
+        'NetworkInterfaceId': 'eni-cases', 'PrivateIpAddress': '10.0.0.1', 'Description': '', 'InterfaceType': 'interface',
+        'Attachment': {'InstanceId': 'i-cases'}, 'Groups': [{'GroupId': 'sg-cases'}]
+    }]}
+    view = map_sg_rules_with_resources('us-east-1', sg_data, rule_data, AttachmentIndex(eni_data, {}))
+    # Prefix-list rules are rows of their own, with the list ID as origin
+    assert len(view.rules) == len(RULE_CASES), view.rules
+    findings = findings_rules_with_governance(view)
+    found = dict(zip(findings["Rules Src/Dst Description"], findings["Findings"]))
+    for rule, expected in RULE_CASES:
+        assert found.get(rule['Description'], "") == expected, (rule['Description'], found.get(rule['Description']))
+    print(f"{len(RULE_CASES)} rule cases ok")
+
+def security_group_rules(sg_data):
+    # describe_security_groups permissions -> describe_security_group_rules entries
+    rules = []
+    for sg in sg_data['SecurityGroups']:
+        for key, egress in (('IpPermissions', False), ('IpPermissionsEgress', True)):
+            for permission in sg.get(key, []):
+                base = {'GroupId': sg['GroupId'], 'IsEgress': egress, 'IpProtocol': permission['IpProtocol']}
+                if 'FromPort' in permission:
+                    base.update(FromPort=permission['FromPort'], ToPort=permission['ToPort'])
+                for ip in permission.get('IpRanges', []):
+                    rules.append({**base, 'CidrIpv4': ip['CidrIp'], 'Description': ip.get('Description')})
+                for ip in permission.get('Ipv6Ranges', []):
+                    rules.append({**base, 'CidrIpv6': ip['CidrIpv6'], 'Description': ip.get('Description')})
+                for group in permission.get('UserIdGroupPairs', []):
+                    rules.append({**base, 'ReferencedGroupInfo': {'GroupId': group['GroupId']},
+                                  'Description': group.get('Description')})
+    return {'SecurityGroupRules': rules}
+
+def legacy_rule_rows(region, sg_data, eni_data, ec2_name_map):
+    # Previous expansion: one 18-key dict per (rule source, attached ENI)
+    sg_list = sg_data['SecurityGroups']
+
+    sg_name_map = {
+        sg['GroupId']: next((tag['Value'] for tag in sg.get('Tags', []) if tag['Key'] == 'Name'), sg.get('GroupName', '-'))
+        for sg in sg_list
+    }
+
+    eni_map = {}
+    for eni in eni_data['NetworkInterfaces']:
+        eni_id = eni.get('NetworkInterfaceId', '-')
+        private_ip = eni.get('PrivateIpAddress', '-')
+        description = eni.get('Description', '-')
+        interface_type = eni.get('InterfaceType', '-')
+        resource_id = eni.get('Attachment', {}).get('InstanceId') or description or '-'
+        resource_type = infer_resource_type(description, interface_type)
+        resource_name = ec2_name_map.get(resource_id, '-') if resource_type == 'EC2' else '-'
+
+        for group in eni.get('Groups', []):
+            sg_id = group['GroupId']
+            eni_map.setdefault(sg_id, []).append({
+                'ENI ID': eni_id,
+                'Private IP': private_ip,
+                'Resource ID': resource_id,
+                'Resource Type': resource_type,
+                'Resource Name': resource_name
+            })
+
+    result = []
+
+    for sg in sg_list:
+        sg_id = sg['GroupId']
+        sg_name = sg_name_map.get(sg_id, '-')
+        description = sg.get('Description', '-')
+        usage_flag = sg_id in eni_map
+        attached_resources = eni_map.get(sg_id, [{
+            'ENI ID': '-', 'Private IP': '-', 'Resource ID': '-', 'Resource Type': '-', 'Resource Name': '-'
+        }])
+
+        def build_rule_rows(rules, direction):
+            rows = []
+            for rule in rules:
+                protocol = rule.get('IpProtocol', '-')
+                protocol = 'all' if protocol == '-1' else protocol
+                from_port = rule.get('FromPort', '-')
+                to_port = rule.get('ToPort', '-')
+                port_range = f"{from_port}-{to_port}" if from_port != to_port else f"{from_port}"
+
+                sources = []
+                sources.extend([(ip.get('CidrIp', '-'), ip.get('Description', '-')) for ip in rule.get('IpRanges', [])])
+                sources.extend([(ip.get('CidrIpv6', '-'), ip.get('Description', '-')) for ip in rule.get('Ipv6Ranges', [])])
+                sources.extend([(group.get('GroupId', '-'), group.get('Description', '-')) for group in rule.get('UserIdGroupPairs', [])])
+
+                for origin, origin_desc in sources:
+                    parsed_name = sg_name_map.get(origin, origin)
+                    for res in attached_resources:
+                        rows.append({
+                            'Security Group Name': sg_name,
+                            'Security Group ID': sg_id,
+                            'SG Description': description,
+                            'Region': region,
+                            'Usage': usage_flag,
+                            'Direction': direction,
+                            'Protocol': protocol,
+                            'Port Range': port_range,
+                            'Src Origin': origin if direction == 'Inbound' else '-',
+                            'Src Parsed': parsed_name if direction == 'Inbound' else '-',
+                            'Des Origin': origin if direction == 'Outbound' else '-',
+                            'Des Parsed': parsed_name if direction == 'Outbound' else '-',
+                            'Rules Src/Dst Description': origin_desc,
+                            'Resource Name': res['Resource Name'],
+                            'Resource ID': res['Resource ID'],
+                            'Resource Type': res['Resource Type'],
+                            'ENI ID': res['ENI ID'],
+                            'Private IP': res['Private IP']
+                        })
+            return rows
+
+        result.extend(build_rule_rows(sg.get('IpPermissions', []), 'Inbound'))
+        result.extend(build_rule_rows(sg.get('IpPermissionsEgress', []), 'Outbound'))
+
+    return result
+
+def legacy_findings(sg_data):
+    # Previous implementation: df.apply with full-frame masks per SG-reference row
+    df = pd.DataFrame(sg_data)
+
+    def analyze_sg(row):
+        findings = []
+        direction = row.get("Direction", "")
+        port = str(row.get("Port Range", ""))
+        source = str(row.get("Src Origin", ""))
+        source_name = str(row.get("Src Parsed", ""))
+        destination = str(row.get("Des Origin", ""))
+        destination_name = str(row.get("Des Parsed", ""))
+        protocol = str(row.get("Protocol", "")).lower()
+        sg_id = row.get("Security Group ID", "")
+
+        if direction == "Inbound" and source == "0.0.0.0/0" and (
+            re.search(r"^22$|^22[-:]", port) or protocol == "all"
+        ):
+            findings.append("Inbound 0.0.0.0/0 open (22/ALL)")
+        if direction == "Outbound" and destination == "0.0.0.0/0" and protocol == "all":
+            findings.append("Outbound 0.0.0.0/0 open (ALL)")
+        if str(row.get("Usage", "")).strip().upper() == "FALSE":
+            findings.append("Unused SG")
+
+        if direction == "Outbound" and destination.startswith("sg-"):
+            if not ((df["Security Group ID"] == destination) & (df["Direction"] == "Inbound") & (df["Src Origin"] == sg_id)).any():
+                if ((df["Security Group ID"] == destination) & (df["Direction"] == "Inbound") & (df["Src Origin"] == "0.0.0.0/0")).any():
+                    findings.append(f"Outbound references {destination_name} but no matching inbound (note: {destination_name} open to 0.0.0.0/0)")
+                else:
+                    findings.append(f"Outbound references {destination_name} but no matching inbound")
+
+        if direction == "Inbound" and source.startswith("sg-"):
+            if not ((df["Security Group ID"] == source) & (df["Direction"] == "Outbound") & (df["Des Origin"] == sg_id)).any():
+                if ((df["Security Group ID"] == source) & (df["Direction"] == "Outbound") & (df["Des Origin"] == "0.0.0.0/0")).any():
+                    findings.append(f"Inbound references {source_name} but no matching outbound (note: {source_name} open to 0.0.0.0/0)")
+                else:
+                    findings.append(f"Inbound references {source_name} but no matching outbound")
+
+        return ", ".join(findings)
+
+    df["Findings"] = df.apply(analyze_sg, axis=1)
+    df_filtered = df[df["Findings"] != ""]
+    columns_to_drop = [
+        "Usage", "Region", "Src Origin", "Des Origin",
+        "Resource Name", "Resource ID", "Resource Type",
+        "ENI ID", "Private IP", "Security Group ID", "SG Description"
+    ]
+    df_filtered = df_filtered.drop(columns=[col for col in columns_to_drop if col in df_filtered.columns])
+    df_filtered = df_filtered.drop_duplicates()
+    cols = df_filtered.columns.tolist()
+    cols.insert(0, cols.pop(cols.index("Findings")))
+    return df_filtered[cols]
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+def sorted_rows(df):
+    return df.astype(str).sort_values(list(df.columns)).reset_index(drop=True)
+
+def peak_memory(func, *args):
+    tracemalloc.start()
+    result = func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, peak
+
+def legacy_pipeline(sg_data, rule_data, eni_data):
+    rows = pd.DataFrame(legacy_rule_rows('us-east-1', sg_data, eni_data, {}))
+    return rows, legacy_findings(rows)
+
+def normalized_pipeline(sg_data, rule_data, eni_data):
+    view = map_sg_rules_with_resources('us-east-1', sg_data, rule_data, AttachmentIndex(eni_data, {}))
+    return view, findings_rules_with_governance(view)
+
+def compare_memory(enis, rules):
+    sg_data, eni_data = shared_account(enis, rules)
+    rule_data = security_group_rules(sg_data)
+    (rows, _), legacy_peak = peak_memory(legacy_pipeline, sg_data, rule_data, eni_data)
+    (view, _), view_peak = peak_memory(normalized_pipeline, sg_data, rule_data, eni_data)
+    pd.testing.assert_frame_equal(sorted_rows(rows), sorted_rows(view.to_frame().astype(object)))
+    _, expand_peak = peak_memory(view.to_frame)
+
+    print(f"{'enis':>8} {'rules':>6} {'rows':>8} {'legacy (MB)':>12} {'view (MB)':>10} {'expanded (MB)':>14}")
+    print(f"{enis:>8} {rules:>6} {len(rows):>8} {legacy_peak / 2**20:>12.1f} {view_peak / 2**20:>10.2f} "
+          f"{expand_peak / 2**20:>14.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--groups', type=int, nargs='+', default=[100, 200, 400])
+    parser.add_argument('--skip-legacy-above', type=int, default=50000,
+                        help="only run the legacy engine up to this many rule rows")
+    parser.add_argument('--shared', type=int, metavar='ENIS',
+                        help="measure peak memory for one SG attached to this many ENIs")
+    parser.add_argument('--rules', type=int, default=40, help="rules on the shared SG")
+    args = parser.parse_args()
+
+    check_rule_cases()
+    if args.shared:
+        compare_memory(args.shared, args.rules)
+        return
+
+    print(f"{'groups':>8} {'rule rows':>10} {'findings':>9} {'legacy (s)':>11} {'joined (s)':>11} {'speedup':>8}")
+    for groups in args.groups:
+        sg_data, eni_data = synthetic_account(groups)
+        view = map_sg_rules_with_resources('us-east-1', sg_data, security_group_rules(sg_data),
+                                           AttachmentIndex(eni_data, {}))
+        joined, joined_seconds = timed(findings_rules_with_governance, view)
+
+        if len(view) > args.skip_legacy_above:
+            print(f"{groups:>8} {len(view):>10} {len(joined):>9} {'-':>11} {joined_seconds:>11.3f} {'-':>8}")
+            continue
+
+        rows = legacy_rule_rows('us-east-1', sg_data, eni_data, {})
+        legacy, legacy_seconds = timed(legacy_findings, rows)
+        # describe_security_group_rules has no per-permission grouping, so rows are compared as sets
+        pd.testing.assert_frame_equal(sorted_rows(legacy), sorted_rows(joined))
+        print(f"{groups:>8} {len(view):>10} {len(joined):>9} {legacy_seconds:>11.3f} {joined_seconds:>11.3f} "
+              f"{legacy_seconds / joined_seconds:>7.0f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,10 @@
+import multiprocessing
+
+# Entry point of the web app and of the PyInstaller binary. Org sweep worker processes
+# re-run the main script before their first task; keeping it this small means they only
+# import modules.collection, not the Flask app and everything it builds at import time.
+if __name__ == '__main__':
+    # Sweep worker processes re-enter the binary when frozen by PyInstaller
+    multiprocessing.freeze_support()
+    from app import run
+    run()
@@ -1,14 +1,14 @@
-from modules.common import exponential_backoff
+from modules.common import paginate
 
 def list_acm_certificates(session):
     client = session.client('acm')
-    certs = exponential_backoff(client.list_certificates).get("CertificateSummaryList", [])
+    certs = paginate(client, "list_certificates", "CertificateSummaryList")
 
     result = []
 
     for cert in certs:
         cert_arn = cert.get("CertificateArn", "-")
-        cert_info = exponential_backoff(client.describe_certificate, CertificateArn=cert_arn).get("Certificate", {})
+        cert_info = client.describe_certificate(CertificateArn=cert_arn).get("Certificate", {})
 
         # datetime 변환 처리
         issued_at = cert_info.get("IssuedAt")
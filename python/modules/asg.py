@@ -1,81 +1,117 @@
-from modules.common import exponential_backoff
+from botocore.exceptions import ClientError
+from modules.common import cached_call, chunked, fetch_all
+
+def describe_instances_by_id(ec2_client, instance_ids):
+    try:
+        return fetch_all(ec2_client, 'describe_instances', InstanceIds=instance_ids)['Reservations']
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'InvalidInstanceID.NotFound':
+            raise
+    # A member was terminated after the ASG listing; filters skip unknown IDs
+    reservations = []
+    for ids in chunked(instance_ids, 200):
+        reservations.extend(fetch_all(
+            ec2_client, 'describe_instances', Filters=[{'Name': 'instance-id', 'Values': ids}]
+        )['Reservations'])
+    return reservations
+
+def build_instance_index(ec2_client, instance_ids):
+    # Instance ID -> instance, up to 1,000 IDs per call
+    instance_index = {}
+    for ids in chunked(sorted(instance_ids), 1000):
+        try:
+            for reservation in describe_instances_by_id(ec2_client, ids):
+                for instance in reservation['Instances']:
+                    instance_index[instance['InstanceId']] = instance
+        except Exception as e:
+            print(f"Error retrieving instance info for {len(ids)} instances: {e}")
+    return instance_index
+
+def build_target_group_index(elb_client, tg_arns):
+    # Target Group ARN -> name, up to 20 ARNs per call
+    tg_name_index = {}
+    for arns in chunked(sorted(tg_arns), 20):
+        try:
+            tg_info = elb_client.describe_target_groups(TargetGroupArns=arns)
+            for tg in tg_info['TargetGroups']:
+                tg_name_index[tg['TargetGroupArn']] = tg['TargetGroupName']
+        except Exception:
+            # One missing ARN fails the whole batch; resolve the rest one by one
+            for tg_arn in arns:
+                try:
+                    tg_info = elb_client.describe_target_groups(TargetGroupArns=[tg_arn])
+                    for tg in tg_info['TargetGroups']:
+                        tg_name_index[tg['TargetGroupArn']] = tg['TargetGroupName']
+                except Exception as e:
+                    print(f"Error retrieving target group info for {tg_arn}: {e}")
+    return tg_name_index
 
 def list_auto_scaling_groups(session):
     asg_data = []
     try:
-        asg_client = session.client('autoscaling')
         ec2_client = session.client('ec2')
         elb_client = session.client('elbv2')
-        paginator = asg_client.get_paginator('describe_auto_scaling_groups')
-        response_iterator = paginator.paginate()
+        auto_scaling_groups = cached_call(session, 'autoscaling', 'describe_auto_scaling_groups')['AutoScalingGroups']
+
+        instance_index = build_instance_index(
+            ec2_client, {instance['InstanceId'] for asg in auto_scaling_groups for instance in asg['Instances']}
+        )
+        tg_name_index = build_target_group_index(
+            elb_client, {tg_arn for asg in auto_scaling_groups for tg_arn in asg.get('TargetGroupARNs', [])}
+        )
 
-        for response in response_iterator:
-            for asg in response['AutoScalingGroups']:
-                name = asg['AutoScalingGroupName']
-                launch_template = "-"
-                if 'LaunchTemplate' in asg:
-                    lt = asg['LaunchTemplate']
-                    launch_template = f"{lt['LaunchTemplateName']} (Version: {lt['Version']})"
-                elif 'LaunchConfigurationName' in asg:
-                    launch_template = asg['LaunchConfigurationName']
+        for asg in auto_scaling_groups:
+            name = asg['AutoScalingGroupName']
+            launch_template = "-"
+            if 'LaunchTemplate' in asg:
+                lt = asg['LaunchTemplate']
+                launch_template = f"{lt['LaunchTemplateName']} (Version: {lt['Version']})"
+            elif 'LaunchConfigurationName' in asg:
+                launch_template = asg['LaunchConfigurationName']
 
-                instances_details = []
-                instance_types = []
-                ami_ids = []
-                security_groups_set = set()
-                for instance in asg['Instances']:
-                    instance_id = instance['InstanceId']
-                    try:
-                        instance_info = exponential_backoff(ec2_client.describe_instances, InstanceIds=[instance_id])
-                        if instance_info['Reservations'] and instance_info['Reservations'][0]['Instances']:
-                            instance_type = instance_info['Reservations'][0]['Instances'][0]['InstanceType']
-                            ami_id = instance_info['Reservations'][0]['Instances'][0]['ImageId']
-                            security_groups = [sg['GroupId'] for sg in instance_info['Reservations'][0]['Instances'][0]['SecurityGroups']]
-                            security_groups_set.update(security_groups)
-                            instances_details.append(instance_id)
-                            instance_types.append(instance_type)
-                            ami_ids.append(ami_id)
-                    except Exception as e:
-                        print(f"Error retrieving instance info for {instance_id}: {e}")
+            instances_details = []
+            instance_types = []
+            ami_ids = []
+            security_groups_set = set()
+            for instance in asg['Instances']:
+                instance_id = instance['InstanceId']
+                instance_info = instance_index.get(instance_id)
+                if instance_info:
+                    security_groups_set.update(sg['GroupId'] for sg in instance_info['SecurityGroups'])
+                    instances_details.append(instance_id)
+                    instance_types.append(instance_info['InstanceType'])
+                    ami_ids.append(instance_info['ImageId'])
 
-                instances = ', '.join(instances_details)
-                instance_types_str = ', '.join(instance_types)
-                ami_ids_str = ', '.join(ami_ids)
-                security_groups_str = ', '.join(security_groups_set)
-                desired_capacity = asg['DesiredCapacity']
-                min_size = asg['MinSize']
-                max_size = asg['MaxSize']
-                availability_zones = ', '.join(asg['AvailabilityZones'])
+            instances = ', '.join(instances_details)
+            instance_types_str = ', '.join(instance_types)
+            ami_ids_str = ', '.join(ami_ids)
+            security_groups_str = ', '.join(security_groups_set)
+            desired_capacity = asg['DesiredCapacity']
+            min_size = asg['MinSize']
+            max_size = asg['MaxSize']
+            availability_zones = ', '.join(asg['AvailabilityZones'])
 
-                # Load Balancer Target Groups
-                target_groups = []
-                for tg_arn in asg.get('TargetGroupARNs', []):
-                    try:
-                        tg_info = exponential_backoff(elb_client.describe_target_groups, TargetGroupArns=[tg_arn])
-                        if tg_info['TargetGroups']:
-                            tg_name = tg_info['TargetGroups'][0]['TargetGroupName']
-                            target_groups.append(tg_name)
-                    except Exception as e:
-                        print(f"Error retrieving target group info for {tg_arn}: {e}")
-                target_groups_str = ', '.join(target_groups)
+            # Load Balancer Target Groups
+            target_groups = [tg_name_index[tg_arn] for tg_arn in asg.get('TargetGroupARNs', []) if tg_arn in tg_name_index]
+            target_groups_str = ', '.join(target_groups)
 
-                # Subnet IDs
-                subnet_ids = ', '.join(asg.get('VPCZoneIdentifier', '').split(','))
+            # Subnet IDs
+            subnet_ids = ', '.join(asg.get('VPCZoneIdentifier', '').split(','))
 
-                asg_data.append({
-                    'Name': name,
-                    'Launch template/configuration': launch_template,
-                    'Instances': instances,
-                    'Instance Type': instance_types_str,
-                    'AMI ID': ami_ids_str,
-                    'Security Group ID': security_groups_str,
-                    'Load Balancer Target Groups': target_groups_str,
-                    'AZ': availability_zones,
-                    'Subnet ID': subnet_ids,
-                    'Desired Capacity': desired_capacity,
-                    'Min': min_size,
-                    'Max': max_size
-                })
+            asg_data.append({
+                'Name': name,
+                'Launch template/configuration': launch_template,
+                'Instances': instances,
+                'Instance Type': instance_types_str,
+                'AMI ID': ami_ids_str,
+                'Security Group ID': security_groups_str,
+                'Load Balancer Target Groups': target_groups_str,
+                'AZ': availability_zones,
+                'Subnet ID': subnet_ids,
+                'Desired Capacity': desired_capacity,
+                'Min': min_size,
+                'Max': max_size
+            })
     except Exception as e:
         print(f"Error retrieving Auto Scaling Groups: {e}")
     return asg_data
\ No newline at end of file
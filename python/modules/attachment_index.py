@@ -0,0 +1,100 @@
+import re
+import pandas as pd
+from modules.common import cached_call, cached_derive
+
+# Description keywords in priority order: the first listed keyword present decides the type
+RESOURCE_TYPE_KEYWORDS = [
+    ('lambda', 'Lambda'),
+    ('elb', 'ELB'),
+    ('rds', 'RDS'),
+    ('msk', 'MSK'),
+    ('kafka', 'MSK'),
+    ('opensearch', 'OpenSearch'),
+    ('es endpoint', 'OpenSearch'),
+    ('efs', 'EFS'),
+    ('mount target', 'EFS'),
+    ('nat gateway', 'NAT Gateway'),
+    ('transit gateway', 'Transit Gateway'),
+    ('tgw', 'Transit Gateway'),
+    ('vpce', 'VPC Endpoint'),
+    ('vpc endpoint', 'VPC Endpoint'),
+    ('redshift', 'Redshift'),
+    ('global accelerator', 'Global Accelerator')
+]
+KEYWORD_PRIORITY = {keyword: (position, resource_type) for position, (keyword, resource_type) in enumerate(RESOURCE_TYPE_KEYWORDS)}
+# One pass over a description finds every keyword; the lookahead lets matches overlap
+RESOURCE_TYPE_PATTERN = re.compile('(?=(' + '|'.join(re.escape(keyword) for keyword, _ in RESOURCE_TYPE_KEYWORDS) + '))')
+
+# Details / Summary columns describing the resource behind an ENI
+RESOURCE_COLUMNS = ['Resource Name', 'Resource ID', 'Resource Type', 'ENI ID', 'Private IP']
+
+def infer_resource_type(description, interface_type):
+    keywords = RESOURCE_TYPE_PATTERN.findall((description or '').lower())
+    if keywords:
+        return min(KEYWORD_PRIORITY[keyword] for keyword in keywords)[1]
+    if interface_type == 'interface': return 'EC2'
+    return 'Unknown'
+
+def build_instance_names(ec2_data):
+    return {
+        inst.get("InstanceId"): next((tag.get("Value") for tag in inst.get("Tags", []) if tag.get("Key") == "Name"), "-")
+        for res in ec2_data.get("Reservations", [])
+        for inst in res.get("Instances", [])
+    }
+
+class AttachmentIndex:
+    """Which ENIs (and behind them which resources) use each security group.
+
+    Built once from describe_network_interfaces and describe_instances:
+    ``groups`` maps SG ID -> ENI IDs, ``interfaces`` maps ENI ID -> its
+    resource row (RESOURCE_COLUMNS) and ``instance_names`` maps instance
+    ID -> Name tag. Use ``attachment_index(session)`` to share one index per
+    (profile, region) collection.
+    """
+
+    def __init__(self, eni_data, ec2_data):
+        self.instance_names = build_instance_names(ec2_data)
+        self.groups = {}
+        self.interfaces = {}
+
+        for eni in eni_data['NetworkInterfaces']:
+            eni_id = eni.get('NetworkInterfaceId', '-')
+            description = eni.get('Description', '-')
+            resource_id = eni.get('Attachment', {}).get('InstanceId') or description or '-'
+            resource_type = infer_resource_type(description, eni.get('InterfaceType', '-'))
+            self.interfaces[eni_id] = {
+                'Resource Name': self.instance_names.get(resource_id, '-') if resource_type == 'EC2' else '-',
+                'Resource ID': resource_id,
+                'Resource Type': resource_type,
+                'ENI ID': eni_id,
+                'Private IP': eni.get('PrivateIpAddress', '-')
+            }
+            for group in eni.get('Groups', []):
+                self.groups.setdefault(group['GroupId'], []).append(eni_id)
+
+        self._attachments = None
+
+    def is_used(self, sg_id):
+        return sg_id in self.groups
+
+    def resources(self, sg_id):
+        return [self.interfaces[eni_id] for eni_id in self.groups.get(sg_id, [])]
+
+    def attachments(self):
+        # One row per (security group, ENI); built on first use and shared, so treat it as read-only
+        if self._attachments is None:
+            rows = [{'Security Group ID': sg_id, **self.interfaces[eni_id]}
+                    for sg_id, eni_ids in self.groups.items() for eni_id in eni_ids]
+            attachments = pd.DataFrame(rows, columns=['Security Group ID'] + RESOURCE_COLUMNS)
+            for column in attachments.columns:
+                attachments[column] = attachments[column].astype('category')
+            self._attachments = attachments
+        return self._attachments
+
+def build_attachment_index(session):
+    eni_data = cached_call(session, 'ec2', 'describe_network_interfaces')
+    ec2_data = cached_call(session, 'ec2', 'describe_instances')
+    return AttachmentIndex(eni_data, ec2_data)
+
+def attachment_index(session):
+    return cached_derive(session, 'attachment-index', build_attachment_index)
@@ -0,0 +1,116 @@
+# Collector registry and per-session collection, shared by the web app and the org sweep.
+# Sweep worker processes run collect_account from here, so this module must not import
+# the Flask app or construct its globals (snapshot store, job registry, result cache).
+import time
+import boto3
+import botocore.session
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from modules.vpc import list_vpcs
+from modules.subnet import list_subnets
+from modules.nacl import list_nacls
+from modules.ec2 import list_ec2_instances
+from modules.asg import list_auto_scaling_groups
+from modules.elb import list_elbs
+from modules.tg import list_target_groups
+from modules.cloudfront import list_cloudfront_distributions
+from modules.s3 import list_s3_buckets
+from modules.db import list_db_clusters
+from modules.elasticache import list_elasticache_clusters
+from modules.msk import list_kafka_clusters
+from modules.sg import list_security_groups
+from modules.sg_detail import fetch_all_sg_data
+from modules.route53 import list_route53, fetch_route53_data
+from modules.opensearch import list_opensearch_clusters
+from modules.dynamodb import list_dynamodb_tables
+from modules.eks import list_eks_clusters
+from modules.acm import list_acm_certificates
+from modules.kms import list_kms_keys
+from modules.secrets_manager import list_secrets_manager
+from modules.sqs import list_sqs_queues
+from modules.ses import list_ses_identities
+from modules.sns import list_sns_topics
+from modules.lamda import list_lambda_functions
+from modules.common import DescribeCache, RETRY_CONFIG
+from modules.rate_limiter import RATE_LIMITER
+from modules.jobs import JobCancelled, run_tracked
+
+RESOURCE_MAP = {
+    "vpcs": list_vpcs,
+    "subnets": list_subnets,
+    "eks": list_eks_clusters,
+    "asg": list_auto_scaling_groups,
+    "ec2": list_ec2_instances,
+    "security-groups": list_security_groups,
+    "nacl": list_nacls,
+    "elbs": list_elbs,
+    "target-groups": list_target_groups,
+    "database": list_db_clusters,
+    "dynamodb": list_dynamodb_tables,
+    "elasticache": list_elasticache_clusters,
+    "msk": list_kafka_clusters,
+    "opensearch": list_opensearch_clusters,
+    "route53": list_route53,
+    "cloudfront": list_cloudfront_distributions,
+    "s3": list_s3_buckets,
+    "lamda": list_lambda_functions,
+    "acm": list_acm_certificates,
+    "kms": list_kms_keys,
+    "secrets-manager": list_secrets_manager,
+    "sqs": list_sqs_queues,
+    "ses": list_ses_identities,
+    "sns": list_sns_topics
+}
+
+DETAIL_RESOURCE_MAP = {
+    "security-groups-details": fetch_all_sg_data,
+    "route53-details": fetch_route53_data
+}
+
+def create_session(profile, region, full_refresh=False):
+    # Every client of the session retries through botocore and shares the process-wide adaptive rate limiter
+    botocore_session = botocore.session.Session()
+    botocore_session.set_default_client_config(RETRY_CONFIG)
+    session = RATE_LIMITER.install(boto3.Session(botocore_session=botocore_session, profile_name=profile, region_name=region))
+    # full_refresh: re-run per-resource enrichment even for resources whose fingerprint is unchanged
+    session.full_refresh = full_refresh
+    return session
+
+def attach_describe_cache(session):
+    # Collectors of one run share a describe cache through the session
+    if getattr(session, 'describe_cache', None) is None:
+        session.describe_cache = DescribeCache()
+    return session
+
+def check_credentials(session):
+    # Collectors log AWS errors and return [], so an expired SSO session would look like an
+    # empty account. Fail the collection up front instead (get_caller_identity needs no permissions)
+    session.client('sts').get_caller_identity()
+
+def run_collectors(resource_map, session, max_workers=10, job=None, on_result=None):
+    # on_result(session, key, result) is called for every collector that finished
+    check_credentials(session)
+    attach_describe_cache(session)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(run_tracked, job, key, func, session): key for key, func in resource_map.items()}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                results[key] = future.result()
+                if on_result is not None:
+                    on_result(session, key, results[key])
+            except JobCancelled:
+                results[key] = []
+            except Exception as e:
+                print(f"[ERROR] {key} failed: {e}")
+                results[key] = []
+    return results
+
+def collect_account(profile, region, max_workers):
+    # Runs inside a sweep worker process: one session, threads capped per account.
+    # Snapshots are saved by the parent as each account arrives
+    started = time.monotonic()
+    session = create_session(profile, region)
+    results = run_collectors({**RESOURCE_MAP, **DETAIL_RESOURCE_MAP}, session, max_workers=max_workers)
+    return time.monotonic() - started, results
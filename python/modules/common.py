@@ -1,19 +1,102 @@
-import time
-import random
-
-def exponential_backoff(func, max_attempts=5, *args, **kwargs):
-    attempt = 0
-    while attempt < max_attempts:
-        try:
-            return func(*args, **kwargs)
-        except Exception as e:
-            # Only retry for throttling errors
-            if getattr(e, 'response', {}).get('Error', {}).get('Code') in ['Throttling', 'ThrottlingException', 'RequestLimitExceeded', 'TooManyRequestsException']:
-                attempt += 1
-                if attempt == max_attempts:
-                    raise e
-                sleep_time = min((2 ** attempt) + random.uniform(0, 1), 30)  # Limit sleep to 30 seconds
-                print(f"Attempt {attempt} failed: {e}. Retrying in {sleep_time:.2f} seconds...")
-                time.sleep(sleep_time)
-            else:
-                raise e
+import json
+import threading
+from concurrent.futures import Future
+from botocore.config import Config
+
+THROTTLING_ERROR_CODES = ['Throttling', 'ThrottlingException', 'RequestLimitExceeded', 'TooManyRequestsException']
+
+# Default client config of every session: botocore retries throttled and transient
+# failures of each request (one page at a time) itself
+RETRY_CONFIG = Config(retries={'mode': 'standard', 'total_max_attempts': 5})
+
+def chunked(items, size):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def page_iterator(client, operation, **params):
+    # Each page request is retried on its own by the client's retry config (RETRY_CONFIG),
+    # so a throttled page does not restart the listing
+    return client.get_paginator(operation).paginate(**params)
+
+def iter_pages(client, operation, **params):
+    if not client.can_paginate(operation):
+        yield getattr(client, operation)(**params)
+        return
+    yield from page_iterator(client, operation, **params)
+
+def paginate(client, operation, result_key, **params):
+    # Yield items lazily as pages arrive; result_key may be dotted, e.g. 'DistributionList.Items'
+    for page in iter_pages(client, operation, **params):
+        items = page
+        for key in result_key.split('.'):
+            items = items.get(key) if isinstance(items, dict) else None
+        yield from items or []
+
+def fetch_all(client, operation, **params):
+    # Follow every page when botocore knows how to paginate the operation. The whole result is
+    # held in memory: DescribeCache shares it between collectors. Use paginate() for one pass.
+    if client.can_paginate(operation):
+        return page_iterator(client, operation, **params).build_full_result()
+    return getattr(client, operation)(**params)
+
+class DescribeCache:
+    """Run-scoped memo of read-only AWS calls shared by every collector.
+
+    Results are keyed by (profile, region, service, operation, params).
+    Concurrent callers of the same key wait on the first caller's in-flight
+    request instead of issuing their own. Cached responses are shared between
+    collectors, so they must be treated as read-only. ``derive`` memoizes
+    structures built from those responses the same way.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results = {}
+        self._clients = {}
+
+    def client(self, session, service):
+        key = (session.profile_name, session.region_name, service)
+        with self._lock:
+            if key not in self._clients:
+                self._clients[key] = session.client(service)
+            return self._clients[key]
+
+    def get(self, session, service, operation, **params):
+        key = (session.profile_name, session.region_name, service, operation,
+               json.dumps(params, sort_keys=True, default=str))
+        return self._memo(key, lambda: fetch_all(self.client(session, service), operation, **params))
+
+    def derive(self, session, name, build):
+        # Structures built from cached responses (e.g. the ENI attachment index), once per run
+        return self._memo((session.profile_name, session.region_name, 'derived', name), lambda: build(session))
+
+    def _memo(self, key, compute):
+        with self._lock:
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._results[key] = future
+
+        if owner:
+            try:
+                future.set_result(compute())
+            except Exception as e:
+                # Waiters see the error, later callers get a fresh attempt
+                with self._lock:
+                    self._results.pop(key, None)
+                future.set_exception(e)
+        return future.result()
+
+def cached_call(session, service, operation, **params):
+    cache = getattr(session, 'describe_cache', None)
+    if cache is None:
+        return fetch_all(session.client(service), operation, **params)
+    return cache.get(session, service, operation, **params)
+
+def cached_derive(session, name, build):
+    cache = getattr(session, 'describe_cache', None)
+    if cache is None:
+        return build(session)
+    return cache.derive(session, name, build)
@@ -1,10 +1,10 @@
-from modules.common import exponential_backoff
+from modules.common import paginate
 
 def list_db_clusters(session):
     rds_data = []
     try:
         rds_client = session.client('rds')
-        clusters = exponential_backoff(rds_client.describe_db_clusters)['DBClusters']
+        clusters = paginate(rds_client, 'describe_db_clusters', 'DBClusters')
 
         for cluster in clusters:
             cluster_name = cluster.get('DBClusterIdentifier', 'N/A')
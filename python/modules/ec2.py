@@ -1,4 +1,4 @@
-from modules.common import exponential_backoff
+from modules.common import cached_call
 
 def list_ec2_instances(session):
     ec2_data = []
@@ -8,46 +8,44 @@ def list_ec2_instances(session):
         region = session.region_name or session.client('ec2').meta.region_name
 
         # account_id 가져오기
-        sts_client = session.client('sts')
-        account_id = sts_client.get_caller_identity().get('Account', '-')
+        account_id = cached_call(session, 'sts', 'get_caller_identity').get('Account', '-')
 
         # profile_name 은 session 객체에는 없어서 외부에서 설정하거나 생략
         profile_name = session.profile_name if hasattr(session, 'profile_name') else '-'
 
-        ec2_client = session.client('ec2')
-        ssm_client = session.client('ssm')
+        instances = cached_call(session, 'ec2', 'describe_instances')
 
-        instances = ec2_client.describe_instances()
+        # SSM managed instances, indexed by instance ID
+        try:
+            ssm_response = cached_call(session, 'ssm', 'describe_instance_information')
+            ssm_managed_ids = {info['InstanceId'] for info in ssm_response.get('InstanceInformationList', [])}
+        except Exception as e:
+            print(f"Error checking SSM managed instances: {e}")
+            ssm_managed_ids = set()
+
+        # EBS volume sizes, indexed by volume ID
+        try:
+            volume_response = cached_call(session, 'ec2', 'describe_volumes')
+            volume_size_map = {vol['VolumeId']: vol['Size'] for vol in volume_response.get('Volumes', [])}
+        except Exception as e:
+            print(f"Error retrieving volume information: {e}")
+            volume_size_map = {}
 
         for reservation in instances.get('Reservations', []):
             for instance in reservation.get('Instances', []):
-
-                def ssm_check():
-                    return ssm_client.describe_instance_information(Filters=[
-                        {'Key': 'InstanceIds', 'Values': [instance['InstanceId']]}
-                    ])
-
-                try:
-                    ssm_response = exponential_backoff(ssm_check)
-                    ssm_managed = len(ssm_response.get('InstanceInformationList', [])) > 0
-                except Exception as e:
-                    print(f"Error checking SSM management for instance {instance['InstanceId']}: {e}")
-                    ssm_managed = False
+                ssm_managed = instance['InstanceId'] in ssm_managed_ids
 
                 volumes_info = []
                 for device in instance.get('BlockDeviceMappings', []):
                     if 'Ebs' in device:
-                        def volume_info():
-                            return ec2_client.describe_volumes(VolumeIds=[device['Ebs']['VolumeId']])
-
-                        try:
-                            volume = exponential_backoff(volume_info)
+                        volume_id = device['Ebs']['VolumeId']
+                        if volume_id in volume_size_map:
                             volumes_info.append({
-                                "VolumeId": device['Ebs']['VolumeId'],
-                                "Size (GB)": volume['Volumes'][0]['Size']
+                                "VolumeId": volume_id,
+                                "Size (GB)": volume_size_map[volume_id]
                             })
-                        except Exception as e:
-                            print(f"Error retrieving volume information for volume {device['Ebs']['VolumeId']}: {e}")
+                        else:
+                            print(f"Error retrieving volume information for volume {volume_id}: not found")
 
                 volumes = ', '.join([vol['VolumeId'] for vol in volumes_info])
                 volume_sizes = ', '.join([f"{vol['Size (GB)']} GB" for vol in volumes_info])
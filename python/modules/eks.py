@@ -1,13 +1,13 @@
-from modules.common import exponential_backoff
+from modules.common import paginate
 
 def list_eks_clusters(session):
     client = session.client('eks')
-    cluster_names = exponential_backoff(client.list_clusters).get("clusters", [])
+    cluster_names = paginate(client, "list_clusters", "clusters")
 
     result = []
 
     for cluster_name in cluster_names:
-        cluster_info = exponential_backoff(client.describe_cluster, name=cluster_name).get("cluster", {})
+        cluster_info = client.describe_cluster(name=cluster_name).get("cluster", {})
 
         created_at = cluster_info.get("createdAt")
         created_at_str = created_at.astimezone().replace(tzinfo=None).isoformat() if created_at else "-"
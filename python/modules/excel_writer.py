@@ -0,0 +1,189 @@
+import re
+import math
+import warnings
+from copy import copy
+from datetime import datetime
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill, Alignment, Font, Border, Side
+from openpyxl.utils import get_column_letter, quote_sheetname
+from openpyxl.worksheet.table import Table, TableColumn, TableStyleInfo
+
+# Excel hard limit per worksheet, header row included
+EXCEL_MAX_ROWS = 1048576
+SHEET_NAME_LIMIT = 31
+DATETIME_FORMAT = 'YYYY-MM-DD HH:MM:SS'
+
+HEADER_FILL = PatternFill(start_color='FFFFCC', end_color='FFFFCC', fill_type='solid')
+FOOTER_FILL = PatternFill(start_color='FFE5E5', end_color='FFE5E5', fill_type='solid')
+CENTER = Alignment(horizontal='center', vertical='center')
+THIN = Side(style='thin')
+HEADER_FONT = Font(bold=True)
+HEADER_BORDER = Border(left=THIN, right=THIN, top=THIN, bottom=THIN)
+
+def sanitize_datetime(df):
+    for col in df.select_dtypes(include=['datetimetz']):
+        df[col] = df[col].dt.tz_localize(None)
+    return df
+
+def column_widths(df):
+    # Longest non-empty value per column (header included) + 2, computed column-wise
+    widths = []
+    for position, column in enumerate(df.columns):
+        values = df.iloc[:, position]
+        values = values[values.notna()]
+        values = values[values.astype(bool)]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            values = values.dt.strftime('%Y-%m-%d %H:%M:%S')
+        longest = values.astype(str).str.len().max() if len(values) else 0
+        widths.append(max(len(str(column)), int(longest)) + 2)
+    return widths
+
+def excel_value(value):
+    if value is None:
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if value is pd.NaT:
+        return None
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.replace(tzinfo=None)
+    if isinstance(value, (list, tuple, dict, set)):
+        return str(value)
+    return value
+
+def split_sheet_names(sheet_name, parts):
+    # "name", "name (2)", ... each within Excel's 31 character limit
+    names = []
+    for part in range(1, parts + 1):
+        suffix = f" ({part})" if part > 1 else ""
+        names.append(sheet_name[:SHEET_NAME_LIMIT - len(suffix)] + suffix)
+    return names
+
+class StreamingExcelWriter:
+    """Writes DataFrames into a write-only workbook in a single pass.
+
+    Header and cell styles, column widths, auto filters, tables, hyperlinks and
+    footers are all set while rows stream out, so nothing is reloaded or
+    walked again afterwards. A DataFrame longer than Excel's row limit is
+    split across "name", "name (2)", ... sheets.
+    """
+
+    def __init__(self, filename, max_rows=EXCEL_MAX_ROWS):
+        self.filename = filename
+        self.max_rows = max_rows
+        self.workbook = Workbook(write_only=True)
+        self.sheet_names = []
+        self._table_names = set()
+
+    def add_sheet(self, sheet_name, df, auto_filter=False, table=False, links=None, footer_link=None):
+        """Write df to one or more sheets and return their names.
+
+        ``links`` maps a column to a function returning the sheet a value
+        should link to (or None). ``footer_link`` adds a merged
+        "Go to <sheet>" row two rows below the data.
+        """
+        df = sanitize_datetime(pd.DataFrame(df))
+        rows_per_sheet = self.max_rows - 1 - (2 if footer_link else 0)
+        parts = max(1, math.ceil(len(df) / rows_per_sheet))
+        names = split_sheet_names(sheet_name[:SHEET_NAME_LIMIT], parts)
+
+        for part, name in enumerate(names):
+            chunk = df.iloc[part * rows_per_sheet:(part + 1) * rows_per_sheet]
+            self._write_sheet(name, chunk, auto_filter, table, links or {}, footer_link)
+        self.sheet_names.extend(names)
+        return names
+
+    def _write_sheet(self, name, df, auto_filter, table, links, footer_link):
+        ws = self.workbook.create_sheet(title=name)
+        max_col = max(len(df.columns), 1)
+        last_cell = f"{get_column_letter(max_col)}{len(df) + 1}"
+
+        # Widths must be set before the first row is streamed
+        for position, width in enumerate(column_widths(df), start=1):
+            ws.column_dimensions[get_column_letter(position)].width = width
+
+        ws.append([self._header_cell(ws, column) for column in df.columns])
+
+        # One styled template per cell kind; rows copy its style array instead of re-resolving styles per cell
+        cell_style = self._template(ws, alignment=CENTER)
+        datetime_style = self._template(ws, alignment=CENTER, number_format=DATETIME_FORMAT)
+        link_style = self._template(ws, style="Hyperlink", alignment=CENTER)
+
+        link_positions = {df.columns.get_loc(column): target for column, target in links.items() if column in df.columns}
+        for values in df.itertuples(index=False, name=None):
+            row = []
+            for position, value in enumerate(values):
+                cell = WriteOnlyCell(ws, value=excel_value(value))
+                cell._style = copy(datetime_style if isinstance(cell.value, datetime) else cell_style)
+                if position in link_positions:
+                    target_sheet = link_positions[position](value)
+                    if target_sheet:
+                        cell.hyperlink = f"#{quote_sheetname(target_sheet)}!A1"
+                        cell._style = copy(link_style)
+                row.append(cell)
+            ws.append(row)
+
+        if auto_filter:
+            ws.auto_filter.ref = f"A1:{last_cell}"
+        if table and len(df) > 0 and len(df.columns) > 0:
+            with warnings.catch_warnings():
+                # openpyxl always warns in write-only mode; _table declares the columns itself
+                warnings.simplefilter("ignore")
+                ws.add_table(self._table(name, f"A1:{last_cell}", [str(column) for column in df.columns]))
+        if footer_link:
+            self._write_footer(ws, len(df) + 3, max_col, footer_link)
+
+    def _template(self, ws, style=None, **attributes):
+        cell = WriteOnlyCell(ws)
+        if style:
+            cell.style = style
+        for attribute, value in attributes.items():
+            setattr(cell, attribute, value)
+        return cell._style
+
+    def _header_cell(self, ws, column):
+        cell = WriteOnlyCell(ws, value=str(column))
+        cell.font = HEADER_FONT
+        cell.border = HEADER_BORDER
+        cell.fill = HEADER_FILL
+        cell.alignment = CENTER
+        return cell
+
+    def _write_footer(self, ws, row_number, max_col, target_sheet):
+        ws.append([])
+        cell = WriteOnlyCell(ws, value=f"Go to {target_sheet}")
+        cell.hyperlink = f"#{quote_sheetname(target_sheet)}!A1"
+        cell.style = "Hyperlink"
+        cell.fill = FOOTER_FILL
+        cell.alignment = CENTER
+        ws.append([cell])
+        ws.merged_cells.add(f"A{row_number}:{get_column_letter(max_col)}{row_number}")
+
+    def _table(self, sheet_name, ref, headers):
+        # Table names: letters, digits and underscores, unique per workbook
+        base = re.sub(r'\W', '_', sheet_name)
+        if not re.match(r'[A-Za-z_]', base):
+            base = f"_{base}"
+        display_name = f"{base}_Table"[:30]
+        suffix = 2
+        while display_name.lower() in self._table_names:
+            display_name = f"{base[:26]}_T{suffix}"
+            suffix += 1
+        self._table_names.add(display_name.lower())
+
+        table = Table(displayName=display_name, ref=ref)
+        # Write-only sheets cannot read the header row back, so columns are declared up front
+        for column_id, header in enumerate(headers, start=1):
+            table.tableColumns.append(TableColumn(id=column_id, name=header))
+        table.tableStyleInfo = TableStyleInfo(name="TableStyleMedium9", showFirstColumn=False,
+                                              showLastColumn=False, showRowStripes=False, showColumnStripes=False)
+        return table
+
+    def save(self):
+        if not self.workbook.worksheets:
+            # An empty workbook is not a valid xlsx file
+            self.workbook.create_sheet(title="Sheet1")
+        self.workbook.save(self.filename)
+        return self.filename
@@ -0,0 +1,117 @@
+import pandas as pd
+from modules.sg_detail import SGRuleView
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional: parquet / arrow exports are unavailable without it
+    pa = None
+    pq = None
+
+# Formats offered next to the formatted xlsx workbooks
+EXPORT_FORMATS = {
+    "csv": "csv",
+    "ndjson": "ndjson",
+    "parquet": "parquet",
+    "arrow": "arrow"
+}
+ARROW_FORMATS = {"parquet", "arrow"}
+
+# Repetitive columns stored dictionary-encoded in parquet / arrow files
+DICTIONARY_COLUMNS = {
+    "Profile", "Region", "Account", "Account ID", "VPC", "VPC ID", "VPC Name",
+    "Availability Zone", "AZ", "Zone", "State", "Status", "Type", "Protocol", "Direction"
+}
+
+# Rows per CSV / NDJSON write and per parquet row group / arrow record batch
+BATCH_ROWS = 128 * 1024
+
+def available_formats():
+    # Parquet / Arrow IPC are only offered when pyarrow is installed
+    return [export_format for export_format in EXPORT_FORMATS if export_format not in ARROW_FORMATS or pa is not None]
+
+def check_export_format(export_format):
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    if export_format in ARROW_FORMATS and pa is None:
+        raise ValueError(f"{export_format} export requires pyarrow (pip install pyarrow)")
+
+def to_frame(data):
+    # Values keep their types: CSV and NDJSON write any value, arrow_column handles the rest
+    return data.to_frame() if isinstance(data, SGRuleView) else pd.DataFrame(data)
+
+def arrow_column(values):
+    try:
+        return pa.array(values, from_pandas=True)
+    except pa.ArrowException:
+        # Values pyarrow cannot put in one type (e.g. "-" placeholders next to numbers) become text;
+        # nulls stay null
+        return pa.array(values.where(values.isna(), values.astype(str)), from_pandas=True)
+
+def to_arrow_table(df):
+    table = pa.Table.from_arrays([arrow_column(df.iloc[:, index]) for index in range(df.shape[1])],
+                                 names=[str(column) for column in df.columns])
+    for index, field in enumerate(table.schema):
+        if field.name in DICTIONARY_COLUMNS and pa.types.is_string(field.type):
+            table = table.set_column(index, field.name, table.column(index).dictionary_encode())
+    return table
+
+# Writers take a binary file object
+def write_csv(df, output):
+    # chunksize keeps pandas writing straight to the output in batches
+    df.to_csv(output, index=False, chunksize=BATCH_ROWS, encoding='utf-8')
+
+def write_ndjson(df, output):
+    for start in range(0, len(df), BATCH_ROWS):
+        chunk = df.iloc[start:start + BATCH_ROWS]
+        output.write(chunk.to_json(orient='records', lines=True, date_format='iso', force_ascii=False).encode('utf-8'))
+        if not chunk.empty:
+            output.write(b'\n')
+
+def write_parquet(df, output):
+    table = to_arrow_table(df)
+    with pq.ParquetWriter(output, table.schema, compression='zstd') as writer:
+        for batch in table.to_batches(max_chunksize=BATCH_ROWS):
+            writer.write_batch(batch)
+
+def write_arrow(df, output):
+    table = to_arrow_table(df)
+    with pa.ipc.new_file(output, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=BATCH_ROWS):
+            writer.write_batch(batch)
+
+WRITERS = {
+    "csv": write_csv,
+    "ndjson": write_ndjson,
+    "parquet": write_parquet,
+    "arrow": write_arrow
+}
+
+def export_dataset(data, output, export_format):
+    """Write one dataset (list of row dicts, DataFrame or SG rule view) to output; returns False when it is empty."""
+    df = to_frame(data)
+    if df.empty:
+        return False
+    WRITERS[export_format](df, output)
+    return True
+
+def route53_records(sheets):
+    # Zone sheets -> one records dataset, tagged with the zone sheet each row came from
+    frames = [df.assign(**{"Hosted Zone": sheet_name}) for sheet_name, df in sheets.items()
+              if sheet_name != "Hosted Zones" and not df.empty]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+def export_datasets(inventory_data, detail_data):
+    """Yield (dataset name, data) for every export file, one per RESOURCE_MAP key plus the detail views."""
+    for key, data in inventory_data.items():
+        yield key, data
+
+    sg_details = detail_data.get("security-groups-details")
+    if isinstance(sg_details, tuple):
+        for sub_sheet, df in zip(["summary", "details", "findings"], sg_details):
+            yield f"security-groups-details-{sub_sheet}", df
+
+    route53_details = detail_data.get("route53-details")
+    if isinstance(route53_details, dict) and route53_details:
+        yield "route53-hosted-zones", route53_details.get("Hosted Zones", pd.DataFrame())
+        yield "route53-records", route53_records(route53_details)
@@ -0,0 +1,406 @@
+import ipaddress
+from modules.common import cached_call
+from modules.attachment_index import attachment_index
+from modules.subnet import build_route_table_index, build_network_acl_index
+
+# IPv4 and IPv6 share one integer line: IPv4 at [0, 2**32), IPv6 shifted above it,
+# so a set of sources of both families is a single sorted list of [start, end] intervals
+IPV6_OFFSET = 2 ** 32
+ALL_IPV4 = [(0, 2 ** 32 - 1)]
+ALL_IPV6 = [(IPV6_OFFSET, IPV6_OFFSET + 2 ** 128 - 1)]
+
+NON_PUBLIC_IPV4 = [
+    '0.0.0.0/8', '10.0.0.0/8', '100.64.0.0/10', '127.0.0.0/8', '169.254.0.0/16',
+    '172.16.0.0/12', '192.168.0.0/16', '224.0.0.0/4', '240.0.0.0/4'
+]
+GLOBAL_UNICAST_IPV6 = '2000::/3'
+
+# A rule source at least this wide that contains public addresses counts as open to the internet
+WIDE_PREFIX = {4: 8, 6: 32}
+
+PROTOCOL_NUMBERS = {'tcp': '6', 'udp': '17', 'icmp': '1', 'icmpv6': '58', 'all': '-1'}
+PORT_MIN, PORT_MAX = 0, 65535
+
+def cidr_interval(cidr):
+    # CIDR -> [start, end] on the shared line, None for SG / prefix-list references
+    try:
+        network = ipaddress.ip_network(cidr, strict=False)
+    except (TypeError, ValueError):
+        return None
+    offset = IPV6_OFFSET if network.version == 6 else 0
+    return (int(network.network_address) + offset, int(network.broadcast_address) + offset)
+
+def normalize(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+def intersect(a, b):
+    # Both sorted and disjoint
+    result = []
+    i = j = 0
+    len_a, len_b = len(a), len(b)
+    while i < len_a and j < len_b:
+        a_start, a_end = a[i]
+        b_start, b_end = b[j]
+        start = a_start if a_start > b_start else b_start
+        if a_end < b_end:
+            if start <= a_end:
+                result.append((start, a_end))
+            i += 1
+        else:
+            if start <= b_end:
+                result.append((start, b_end))
+            j += 1
+    return result
+
+def subtract(a, b):
+    result = []
+    j = 0
+    for start, end in a:
+        while j < len(b) and b[j][1] < start:
+            j += 1
+        k = j
+        while k < len(b) and b[k][0] <= end:
+            if b[k][0] > start:
+                result.append((start, b[k][0] - 1))
+            start = max(start, b[k][1] + 1)
+            k += 1
+        if start <= end:
+            result.append((start, end))
+    return result
+
+PUBLIC_SPACE = normalize(
+    subtract(ALL_IPV4, normalize([cidr_interval(cidr) for cidr in NON_PUBLIC_IPV4]))
+    + [cidr_interval(GLOBAL_UNICAST_IPV6)]
+)
+PUBLIC_IPV4 = intersect(PUBLIC_SPACE, ALL_IPV4)
+PUBLIC_IPV6 = intersect(PUBLIC_SPACE, ALL_IPV6)
+
+def is_internet_wide(cidr):
+    """True for sources like 0.0.0.0/0, 0.0.0.0/1 or ::/0: wide prefixes reaching public addresses."""
+    try:
+        network = ipaddress.ip_network(cidr, strict=False)
+    except (TypeError, ValueError):
+        return False
+    return network.prefixlen <= WIDE_PREFIX[network.version] and bool(intersect([cidr_interval(cidr)], PUBLIC_SPACE))
+
+def summarize(intervals, family):
+    offset = IPV6_OFFSET if family is ALL_IPV6 else 0
+    address = ipaddress.IPv6Address if family is ALL_IPV6 else ipaddress.IPv4Address
+    return [str(network) for start, end in intersect(intervals, family)
+            for network in ipaddress.summarize_address_range(address(start - offset), address(end - offset))]
+
+def describe_sources(intervals, limit=5):
+    # Interval list -> "internet (IPv4)", "internet (IPv4) except ..." or a short CIDR list for the sheet
+    labels = []
+    for family, public, name in ((ALL_IPV4, PUBLIC_IPV4, 'IPv4'), (ALL_IPV6, PUBLIC_IPV6, 'IPv6')):
+        part = intersect(intervals, family)
+        if not part:
+            continue
+        missing = summarize(subtract(public, part), family)
+        if len(missing) <= limit:
+            labels.append(f"internet ({name})" + (f" except {', '.join(missing)}" if missing else ""))
+            continue
+        networks = summarize(part, family)
+        labels.append(', '.join(networks[:limit]) + (f" (+{len(networks) - limit} more)" if len(networks) > limit else ""))
+    return ', '.join(labels)
+
+def port_ranges(segments):
+    return ', '.join(f"{start}" if start == end else f"{start}-{end}" for start, end in segments)
+
+def protocol_number(protocol):
+    protocol = str(protocol).lower()
+    return PROTOCOL_NUMBERS.get(protocol, protocol)
+
+def parse_ports(ports):
+    # "22,443,8000-8100" -> [(22, 22), (443, 443), (8000, 8100)]
+    segments = []
+    for part in str(ports).split(','):
+        part = part.strip()
+        if not part:
+            continue
+        start, _, end = part.partition('-')
+        try:
+            start, end = int(start), int(end or start)
+        except ValueError:
+            raise ValueError(f"Invalid port range: {part}")
+        if not PORT_MIN <= start <= end <= PORT_MAX:
+            raise ValueError(f"Invalid port range: {part}")
+        segments.append((start, end))
+    return segments
+
+class PortRule:
+    """One allow (or deny) entry of a layer: protocol, port interval and source intervals."""
+
+    __slots__ = ('protocol', 'from_port', 'to_port', 'sources', 'allow')
+
+    def __init__(self, protocol, from_port, to_port, sources, allow=True):
+        self.protocol = protocol
+        self.from_port = PORT_MIN if from_port in (None, -1) else from_port
+        self.to_port = PORT_MAX if to_port in (None, -1) else to_port
+        self.sources = sources
+        self.allow = allow
+
+    def matches(self, protocol, start, end):
+        # Whole segment [start, end] inside the rule; segments never straddle a rule boundary
+        return self.protocol in ('-1', protocol) and self.from_port <= start and end <= self.to_port
+
+def rule_boundaries(rules, protocol):
+    # Port segment edges: the exposure answer can only change where a rule's port range starts or ends
+    edges = set()
+    for rule in rules:
+        if rule.protocol == protocol:
+            edges.add(rule.from_port)
+            edges.add(rule.to_port + 1)
+    return edges
+
+def split_segments(segments, edges):
+    result = []
+    for start, end in segments:
+        cuts = sorted(edge for edge in edges if start < edge <= end)
+        for cut in cuts:
+            result.append((start, cut - 1))
+            start = cut
+        result.append((start, end))
+    return result
+
+class ExposureEngine:
+    """Which ENIs can be reached from internet sources, and on which ports.
+
+    An address reaches an ENI when all three layers let it through:
+
+    - routing: the subnet's longest-prefix route back to that address goes to
+      an internet gateway, and the ENI has a public IPv4 / an IPv6 address
+    - NACL: the subnet's inbound entries, evaluated in rule-number order
+    - security groups: any inbound rule of any group on the ENI
+
+    Each layer is reduced to sorted, disjoint integer intervals over IPv4 and
+    IPv6 sources, so the check is a few interval intersections instead of
+    string matching. Port ranges are cut into segments at rule boundaries, and
+    ENIs sharing security groups, subnet and address families are evaluated
+    once. Prefix-list and SG-reference sources never count as internet, and
+    outbound NACL entries for the reply traffic are not evaluated.
+    """
+
+    def __init__(self, rule_data, eni_data, network_acls, route_tables, subnets):
+        self.group_rules = {}
+        for rule in rule_data.get('SecurityGroupRules', []):
+            if rule.get('IsEgress'):
+                continue
+            interval = cidr_interval(rule.get('CidrIpv4') or rule.get('CidrIpv6'))
+            if interval is None:
+                continue
+            self.group_rules.setdefault(rule['GroupId'], []).append(PortRule(
+                protocol_number(rule.get('IpProtocol', '-1')), rule.get('FromPort'), rule.get('ToPort'), [interval]
+            ))
+
+        self.acl_entries = {}
+        for acl in network_acls:
+            entries = sorted((entry for entry in acl.get('Entries', []) if not entry.get('Egress')),
+                             key=lambda entry: entry.get('RuleNumber', 32767))
+            self.acl_entries[acl['NetworkAclId']] = [PortRule(
+                protocol_number(entry.get('Protocol', '-1')),
+                entry.get('PortRange', {}).get('From'), entry.get('PortRange', {}).get('To'),
+                [cidr_interval(entry.get('CidrBlock') or entry.get('Ipv6CidrBlock'))],
+                allow=entry.get('RuleAction') == 'allow'
+            ) for entry in entries if cidr_interval(entry.get('CidrBlock') or entry.get('Ipv6CidrBlock'))]
+
+        subnet_route_tables, main_route_tables = build_route_table_index(route_tables)
+        subnet_network_acls = build_network_acl_index(network_acls)
+        self.subnets = {}
+        for subnet in subnets:
+            subnet_id, vpc_id = subnet['SubnetId'], subnet['VpcId']
+            tables = subnet_route_tables.get(subnet_id) or ([main_route_tables[vpc_id]] if vpc_id in main_route_tables else [])
+            acls = subnet_network_acls.get(subnet_id, [])
+            self.subnets[subnet_id] = {
+                'VPC ID': vpc_id,
+                'Route Table': tables[0]['RouteTableId'] if tables else '-',
+                'Network ACL': acls[0]['NetworkAclId'] if acls else '-',
+                'routed': internet_routed(tables[0]) if tables else []
+            }
+
+        self.eni_data = eni_data
+        self._memo = {}
+
+    def layer_profile(self, rules, protocol, segments, first_match):
+        """[(segment, allowed sources)] of one layer over all sources, cut at its rule boundaries.
+
+        Security groups allow the union of their matching rules. NACL entries
+        are evaluated in order and the first one matching a source decides;
+        since that is decided address by address, the NACL profile over all
+        sources can later be intersected with whatever the other layers allow.
+        """
+        profile = []
+        for segment in split_segments(segments, rule_boundaries(rules, protocol)):
+            matching = [rule for rule in rules if rule.matches(protocol, *segment)]
+            if first_match:
+                remaining, allowed = PUBLIC_SPACE, []
+                for rule in matching:
+                    if not remaining:
+                        break
+                    if rule.allow:
+                        allowed.extend(intersect(remaining, rule.sources))
+                    remaining = subtract(remaining, rule.sources)
+                allowed = normalize(allowed)
+            else:
+                allowed = normalize([source for rule in matching for source in rule.sources])
+            if allowed:
+                profile.append((segment, allowed))
+        return profile
+
+    def group_profile(self, group_ids, protocol, segments):
+        key = ('groups', group_ids, protocol, segments)
+        if key not in self._memo:
+            rules = [rule for group_id in group_ids for rule in self.group_rules.get(group_id, [])]
+            self._memo[key] = self.layer_profile(rules, protocol, segments, first_match=False)
+        return self._memo[key]
+
+    def acl_profile(self, acl_id, protocol, segments):
+        key = ('acl', acl_id, protocol, segments)
+        if key not in self._memo:
+            if acl_id in self.acl_entries:
+                self._memo[key] = self.layer_profile(self.acl_entries[acl_id], protocol, segments, first_match=True)
+            else:  # no NACL data: do not hide exposure
+                self._memo[key] = [(segment, PUBLIC_SPACE) for segment in segments]
+        return self._memo[key]
+
+    def subnet_profile(self, subnet_id, families, protocol, segments, probe):
+        # NACL profile already narrowed to the sources the subnet routes to the internet
+        key = ('subnet', subnet_id, families, protocol, segments, probe)
+        if key not in self._memo:
+            subnet = self.subnets.get(subnet_id, {})
+            reachable_space = intersect(intersect(probe, families), subnet.get('routed', []))
+            profile = []
+            if reachable_space:
+                for segment, sources in self.acl_profile(subnet.get('Network ACL'), protocol, segments):
+                    sources = intersect(sources, reachable_space)
+                    if sources:
+                        profile.append((segment, sources))
+            self._memo[key] = profile
+        return self._memo[key]
+
+    def evaluate(self, group_ids, subnet_id, families, protocol, segments, probe):
+        """[(port segments, reachable source intervals)] for one (groups, subnet, address families) combination."""
+        key = ('eni', group_ids, subnet_id, families, protocol, segments, probe)
+        if key in self._memo:
+            return self._memo[key]
+
+        results = []
+        groups = self.group_profile(group_ids, protocol, segments)
+        subnet = self.subnet_profile(subnet_id, families, protocol, segments, probe) if groups else []
+        # Overlay the two segment lists; both are sorted and non-overlapping
+        i = j = 0
+        while i < len(groups) and j < len(subnet):
+            (group_segment, group_sources), (subnet_segment, subnet_sources) = groups[i], subnet[j]
+            start, end = max(group_segment[0], subnet_segment[0]), min(group_segment[1], subnet_segment[1])
+            if start <= end:
+                sources = intersect(group_sources, subnet_sources)
+                if sources:
+                    results.append(((start, end), sources))
+            if group_segment[1] < subnet_segment[1]:
+                i += 1
+            else:
+                j += 1
+
+        self._memo[key] = merge_segments(results)
+        return self._memo[key]
+
+    def exposed_interfaces(self, ports=None, protocol='tcp', source=None):
+        """Yield (eni, subnet info, port segments, reachable sources) for every exposed ENI."""
+        protocol = protocol_number(protocol)
+        segments = parse_ports(ports) if ports else [(PORT_MIN, PORT_MAX)]
+        probe = PUBLIC_SPACE
+        if source:
+            interval = cidr_interval(source)
+            if interval is None:
+                raise ValueError(f"Invalid source address or CIDR: {source}")
+            probe = intersect(PUBLIC_SPACE, [interval])
+
+        for eni in self.eni_data.get('NetworkInterfaces', []):
+            families = []
+            if public_ipv4(eni):
+                families.extend(ALL_IPV4)
+            if eni.get('Ipv6Addresses'):
+                families.extend(ALL_IPV6)
+            if not families:
+                continue
+            group_ids = tuple(sorted(group['GroupId'] for group in eni.get('Groups', [])))
+            exposure = self.evaluate(group_ids, eni.get('SubnetId'), tuple(families), protocol, tuple(segments), tuple(probe))
+            if exposure:
+                yield eni, self.subnets.get(eni.get('SubnetId'), {}), exposure
+
+def merge_segments(results):
+    # Adjacent port segments reachable from the same sources become one range
+    merged = []
+    for segment, sources in results:
+        if merged and merged[-1][1] == sources and merged[-1][0][-1][1] + 1 == segment[0]:
+            merged[-1][0][-1] = (merged[-1][0][-1][0], segment[1])
+        else:
+            merged.append(([segment], sources))
+    return merged
+
+def internet_routed(route_table):
+    # Sources whose longest-prefix route goes to an internet gateway (the reply path)
+    routes = []
+    for route in route_table.get('Routes', []):
+        if route.get('State') == 'blackhole':
+            continue
+        interval = cidr_interval(route.get('DestinationCidrBlock') or route.get('DestinationIpv6CidrBlock'))
+        if interval is not None:
+            routes.append((interval, str(route.get('GatewayId', '')).startswith('igw-')))
+
+    claimed, routed = [], []
+    for interval, to_internet in sorted(routes, key=lambda item: item[0][1] - item[0][0]):
+        unclaimed = subtract([interval], claimed)
+        if to_internet:
+            routed.extend(unclaimed)
+        claimed = normalize(claimed + [interval])
+    return normalize(routed)
+
+def public_ipv4(eni):
+    if eni.get('Association', {}).get('PublicIp'):
+        return eni['Association']['PublicIp']
+    for address in eni.get('PrivateIpAddresses', []):
+        if address.get('Association', {}).get('PublicIp'):
+            return address['Association']['PublicIp']
+    return None
+
+def list_exposure(session, ports=None, protocol='tcp', source=None):
+    region = session.region_name
+    engine = ExposureEngine(
+        cached_call(session, 'ec2', 'describe_security_group_rules', MaxResults=1000),
+        cached_call(session, 'ec2', 'describe_network_interfaces'),
+        cached_call(session, 'ec2', 'describe_network_acls').get('NetworkAcls', []),
+        cached_call(session, 'ec2', 'describe_route_tables').get('RouteTables', []),
+        cached_call(session, 'ec2', 'describe_subnets')['Subnets']
+    )
+    index = attachment_index(session)
+
+    rows = []
+    for eni, subnet, exposure in engine.exposed_interfaces(ports, protocol, source):
+        resource = index.interfaces.get(eni.get('NetworkInterfaceId'), {})
+        for segments, sources in exposure:
+            rows.append({
+                'Resource Name': resource.get('Resource Name', '-'),
+                'Resource ID': resource.get('Resource ID', '-'),
+                'Resource Type': resource.get('Resource Type', '-'),
+                'ENI ID': eni.get('NetworkInterfaceId', '-'),
+                'Private IP': eni.get('PrivateIpAddress', '-'),
+                'Public IP': public_ipv4(eni) or '-',
+                'Region': region,
+                'VPC ID': subnet.get('VPC ID', eni.get('VpcId', '-')),
+                'Subnet ID': eni.get('SubnetId', '-'),
+                'Route Table': subnet.get('Route Table', '-'),
+                'Network ACL': subnet.get('Network ACL', '-'),
+                'Security Groups': ', '.join(group['GroupId'] for group in eni.get('Groups', [])),
+                'Protocol': str(protocol).lower(),
+                'Port Range': port_ranges(segments),
+                'Reachable From': describe_sources(sources)
+            })
+    return rows
@@ -0,0 +1,56 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+# Upper bound on how long an enrichment is reused while its fingerprint is unchanged,
+# since some changes (bucket settings) never show up in list calls
+ENRICHMENT_MAX_AGE = int(os.environ.get('ENRICHMENT_MAX_AGE', '300'))
+
+def fingerprint(resource, *keys):
+    # Hash of the cheap list-level attributes of one resource
+    values = {key: resource.get(key) for key in keys}
+    return hashlib.sha1(json.dumps(values, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+class EnrichmentCache:
+    """Process-wide memo of per-resource enrichment, keyed by list-level fingerprint.
+
+    Entries are scoped by (profile, region, namespace) and looked up by resource
+    id. A stored result is reused while the resource's fingerprint is unchanged
+    and the result is younger than ``max_age``; anything else is recomputed.
+    A session with ``full_refresh`` set recomputes everything. ``prune`` drops
+    resources that no longer appear in the list call.
+    """
+
+    def __init__(self):
+        self._scopes = {}
+        self._lock = threading.Lock()
+
+    def _scope(self, session, namespace):
+        key = (session.profile_name, session.region_name, namespace)
+        with self._lock:
+            return self._scopes.setdefault(key, {})
+
+    def enrich(self, session, namespace, resource_id, resource_fingerprint, compute, max_age=ENRICHMENT_MAX_AGE):
+        entries = self._scope(session, namespace)
+        if not getattr(session, 'full_refresh', False):
+            with self._lock:
+                entry = entries.get(resource_id)
+            if entry and entry[0] == resource_fingerprint and time.time() - entry[1] <= max_age:
+                return entry[2]
+
+        # Errors propagate and nothing is stored, so the next run retries
+        value = compute()
+        with self._lock:
+            entries[resource_id] = (resource_fingerprint, time.time(), value)
+        return value
+
+    def prune(self, session, namespace, resource_ids):
+        entries = self._scope(session, namespace)
+        resource_ids = set(resource_ids)
+        with self._lock:
+            for resource_id in [key for key in entries if key not in resource_ids]:
+                del entries[resource_id]
+
+ENRICHMENT_CACHE = EnrichmentCache()
@@ -0,0 +1,178 @@
+import socket
+from modules.common import cached_call
+from modules.attachment_index import attachment_index
+from modules.exposure import IPV6_OFFSET, cidr_interval
+
+def address_key(text):
+    # Address text -> integer on the shared IPv4 / IPv6 line (see modules.exposure), None when invalid
+    text = text.strip()
+    try:
+        return int.from_bytes(socket.inet_pton(socket.AF_INET, text), 'big')
+    except OSError:
+        pass
+    try:
+        return int.from_bytes(socket.inet_pton(socket.AF_INET6, text.split('%')[0]), 'big') + IPV6_OFFSET
+    except OSError:
+        return None
+
+class PrefixIndex:
+    """Longest-prefix match over CIDRs that may repeat (the same private range in several VPCs).
+
+    One hash table per prefix length actually present, probed longest first:
+    the same walk a radix trie does, but with a few dict lookups per address
+    instead of one node per bit. Each CIDR keeps every entry stored for it.
+    """
+
+    def __init__(self):
+        self._tables = {}  # (family, host bits) -> {network start: [entries]}
+        self._probe_order = []
+
+    def add(self, cidr, entry):
+        interval = cidr_interval(cidr)
+        if interval is None:
+            return
+        start, end = interval
+        family = 6 if start >= IPV6_OFFSET else 4
+        host_bits = (end - start + 1).bit_length() - 1
+        self._tables.setdefault((family, host_bits), {}).setdefault(start, []).append(entry)
+        # Fewest host bits = longest prefix first
+        self._probe_order = sorted(self._tables, key=lambda key: key[1])
+
+    def longest_match(self, key):
+        family = 6 if key >= IPV6_OFFSET else 4
+        base = IPV6_OFFSET if family == 6 else 0
+        for table_family, host_bits in self._probe_order:
+            if table_family != family:
+                continue
+            network = (((key - base) >> host_bits) << host_bits) + base
+            entries = self._tables[(table_family, host_bits)].get(network)
+            if entries:
+                return entries
+        return []
+
+class IpOwnerIndex:
+    """Which ENI / resource, subnet and VPC an address belongs to.
+
+    Exact addresses (private, secondary, public and IPv6 addresses of every
+    ENI) are a dict lookup; addresses no ENI holds fall back to a longest
+    prefix match over subnet and then VPC CIDRs. Lookups return one row per
+    candidate, since overlapping private ranges can exist in several VPCs.
+    """
+
+    def __init__(self, eni_data, subnets, vpcs, resources=None):
+        resources = resources or {}
+        self.subnet_blocks = {subnet['SubnetId']: cidr_blocks(subnet) for subnet in subnets}
+        self.vpc_blocks = {vpc['VpcId']: cidr_blocks(vpc) for vpc in vpcs}
+        self.vpc_names = {
+            vpc['VpcId']: next((tag['Value'] for tag in vpc.get('Tags', []) if tag['Key'] == 'Name'), '-')
+            for vpc in vpcs
+        }
+
+        self.addresses = {}
+        for eni in eni_data.get('NetworkInterfaces', []):
+            eni_id = eni.get('NetworkInterfaceId', '-')
+            resource = resources.get(eni_id, {})
+            owner = {
+                'Owner': resource.get('Resource Name', '-'),
+                'Resource ID': resource.get('Resource ID', '-'),
+                'Resource Type': resource.get('Resource Type', '-'),
+                'ENI ID': eni_id,
+                'Subnet ID': eni.get('SubnetId', '-'),
+                'VPC ID': eni.get('VpcId', '-')
+            }
+            for address, kind in eni_addresses(eni):
+                key = address_key(address)
+                if key is not None:
+                    self.addresses.setdefault(key, []).append({**owner, 'Match': kind})
+
+        self.subnet_prefixes = PrefixIndex()
+        for subnet in subnets:
+            for cidr, _ in self.subnet_blocks[subnet['SubnetId']]:
+                self.subnet_prefixes.add(cidr, (subnet['SubnetId'], subnet['VpcId']))
+
+        self.vpc_prefixes = PrefixIndex()
+        for vpc in vpcs:
+            for cidr, _ in self.vpc_blocks[vpc['VpcId']]:
+                self.vpc_prefixes.add(cidr, vpc['VpcId'])
+
+    def lookup(self, address):
+        """Rows describing the owner(s) of one address."""
+        key = address_key(address)
+        if key is None:
+            return [self.row(address, 'Invalid address')]
+
+        owners = self.addresses.get(key)
+        if owners:
+            return [self.row(address, owner['Match'], key, owner['Subnet ID'], owner['VPC ID'], owner) for owner in owners]
+
+        subnets = self.subnet_prefixes.longest_match(key)
+        if subnets:
+            return [self.row(address, 'Subnet CIDR', key, subnet_id, vpc_id) for subnet_id, vpc_id in subnets]
+
+        vpcs = self.vpc_prefixes.longest_match(key)
+        if vpcs:
+            return [self.row(address, 'VPC CIDR', key, vpc_id=vpc_id) for vpc_id in vpcs]
+        return [self.row(address, 'Not found')]
+
+    def lookup_many(self, addresses):
+        # Flow logs repeat the same addresses: each distinct one is resolved once
+        resolved = {}
+        rows = []
+        for address in addresses:
+            address = str(address).strip()
+            if not address:
+                continue
+            if address not in resolved:
+                resolved[address] = self.lookup(address)
+            rows.extend(resolved[address])
+        return rows
+
+    def row(self, address, match, key=None, subnet_id='-', vpc_id='-', owner=None):
+        owner = owner or {}
+        return {
+            'IP': address,
+            'Match': match,
+            'Owner': owner.get('Owner', '-'),
+            'Resource ID': owner.get('Resource ID', '-'),
+            'Resource Type': owner.get('Resource Type', '-'),
+            'ENI ID': owner.get('ENI ID', '-'),
+            'Subnet ID': subnet_id,
+            'Subnet CIDR': containing(self.subnet_blocks.get(subnet_id, []), key),
+            'VPC ID': vpc_id,
+            'VPC Name': self.vpc_names.get(vpc_id, '-'),
+            'VPC CIDR': containing(self.vpc_blocks.get(vpc_id, []), key)
+        }
+
+def cidr_blocks(network):
+    # IPv4 and IPv6 CIDRs of a subnet or VPC
+    blocks = [block.get('CidrBlock') for block in network.get('CidrBlockAssociationSet', [])] or [network.get('CidrBlock')]
+    blocks += [block.get('Ipv6CidrBlock') for block in network.get('Ipv6CidrBlockAssociationSet', [])]
+    return [(cidr, cidr_interval(cidr)) for cidr in blocks if cidr and cidr_interval(cidr)]
+
+def containing(blocks, key):
+    # The CIDR holding the address, the first one for addresses outside all of them (e.g. public IPs)
+    for cidr, (start, end) in blocks:
+        if key is not None and start <= key <= end:
+            return cidr
+    return blocks[0][0] if blocks else '-'
+
+def eni_addresses(eni):
+    # (address, match kind) for every address an ENI holds
+    for private in eni.get('PrivateIpAddresses', []) or [{'PrivateIpAddress': eni.get('PrivateIpAddress')}]:
+        if private.get('PrivateIpAddress'):
+            yield private['PrivateIpAddress'], 'ENI private IP'
+        if private.get('Association', {}).get('PublicIp'):
+            yield private['Association']['PublicIp'], 'ENI public IP'
+    if not eni.get('PrivateIpAddresses') and eni.get('Association', {}).get('PublicIp'):
+        yield eni['Association']['PublicIp'], 'ENI public IP'
+    for ipv6 in eni.get('Ipv6Addresses', []):
+        if ipv6.get('Ipv6Address'):
+            yield ipv6['Ipv6Address'], 'ENI IPv6'
+
+def build_ip_owner_index(session):
+    return IpOwnerIndex(
+        cached_call(session, 'ec2', 'describe_network_interfaces'),
+        cached_call(session, 'ec2', 'describe_subnets')['Subnets'],
+        cached_call(session, 'ec2', 'describe_vpcs')['Vpcs'],
+        attachment_index(session).interfaces
+    )
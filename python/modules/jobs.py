@@ -0,0 +1,152 @@
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class JobCancelled(Exception):
+    pass
+
+class DownloadJob:
+    """A background download with per-task progress and a cancel flag.
+
+    Tasks are collectors (or whole accounts in a sweep). A cancelled job
+    stops starting new tasks; tasks already talking to AWS finish, but their
+    results are discarded.
+    """
+
+    def __init__(self, mode, params):
+        self.id = uuid.uuid4().hex
+        self.mode = mode
+        self.params = params
+        self.status = 'queued'
+        self.error = None
+        self.artifact = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.tasks = {}
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled()
+
+    def update_task(self, name, status, seconds=None):
+        with self._lock:
+            self.tasks[name] = {'status': status, 'seconds': round(seconds, 2) if seconds is not None else None}
+
+    def run_task(self, name, func, *args):
+        self.check_cancelled()
+        self.update_task(name, 'running')
+        started = time.monotonic()
+        try:
+            result = func(*args)
+        except Exception:
+            self.update_task(name, 'failed', time.monotonic() - started)
+            raise
+        self.update_task(name, 'done', time.monotonic() - started)
+        return result
+
+    def to_dict(self):
+        with self._lock:
+            tasks = dict(self.tasks)
+        counts = {}
+        for task in tasks.values():
+            counts[task['status']] = counts.get(task['status'], 0) + 1
+        return {
+            'job_id': self.id,
+            'mode': self.mode,
+            'params': self.params,
+            'status': self.status,
+            'error': self.error,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+            'elapsed': round((self.finished or time.time()) - self.started, 2) if self.started else None,
+            'task_counts': counts,
+            'tasks': tasks,
+            'download_name': self.artifact[1] if self.artifact else None
+        }
+
+def run_tracked(job, name, func, *args):
+    if job is None:
+        return func(*args)
+    return job.run_task(name, func, *args)
+
+class JobRegistry:
+    """Runs download jobs on a small pool and keeps finished artifacts for `retention` seconds.
+
+    An artifact is (members, download name): ``members()`` renders the files
+    of the collected data, which the download streams into a zip. It is
+    released once downloaded; expired jobs are dropped every ``expire_every``
+    seconds and whenever a job is looked up.
+    """
+
+    def __init__(self, max_workers=2, retention=6 * 3600, expire_every=300):
+        self.retention = retention
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        threading.Thread(target=self._expire_loop, args=(expire_every,), daemon=True).start()
+
+    def submit(self, mode, params, runner):
+        self.expire()
+        job = DownloadJob(mode, params)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, runner)
+        return job
+
+    def get(self, job_id):
+        self.expire()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def release(self, job):
+        # After a complete download the collected data is no longer needed
+        job.artifact = None
+        job.status = 'downloaded'
+
+    def _run(self, job, runner):
+        if job.cancelled:
+            job.status = 'cancelled'
+            job.finished = time.time()
+            return
+
+        job.status = 'running'
+        job.started = time.time()
+        try:
+            artifact = runner(job)
+            if job.cancelled:
+                job.status = 'cancelled'
+            else:
+                job.artifact = artifact
+                job.status = 'done'
+        except JobCancelled:
+            job.status = 'cancelled'
+        except Exception as e:
+            print(f"[ERROR] Job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished = time.time()
+
+    def _expire_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            self.expire()
+
+    def expire(self):
+        now = time.time()
+        with self._lock:
+            expired = [job for job in self._jobs.values() if job.finished and now - job.finished > self.retention]
+            for job in expired:
+                del self._jobs[job.id]
@@ -1,14 +1,14 @@
-from modules.common import exponential_backoff
+from modules.common import paginate
 
 def list_kms_keys(session):
     client = session.client('kms')
-    keys = exponential_backoff(client.list_keys).get("Keys", [])
+    keys = paginate(client, "list_keys", "Keys")
 
     result = []
 
     for key in keys:
         key_id = key.get("KeyId", "-")
-        key_info = exponential_backoff(client.describe_key, KeyId=key_id).get("KeyMetadata", {})
+        key_info = client.describe_key(KeyId=key_id).get("KeyMetadata", {})
 
         creation_date = key_info.get("CreationDate")
         creation_date_str = creation_date.astimezone().replace(tzinfo=None).isoformat() if creation_date else "-"
@@ -1,12 +1,12 @@
-from modules.common import exponential_backoff
+from botocore.exceptions import BotoCoreError, ClientError
+from modules.common import cached_call
 
 def list_nacls(session):
-    ec2_client = session.client('ec2')
     nacls = []
 
     try:
         # Retrieve all NACLs
-        response = exponential_backoff(ec2_client.describe_network_acls)
+        response = cached_call(session, 'ec2', 'describe_network_acls')
         
         for nacl in response.get('NetworkAcls', []):
             nacl_id = nacl.get('NetworkAclId', '-')
@@ -47,7 +47,7 @@ def list_nacls(session):
                     'Allow / Deny': allow_deny
                 })
     
-    except (BotoCoreError) as e:
+    except (BotoCoreError, ClientError) as e:
         print(f"Error retrieving NACLs: {e}")
 
     return nacls
@@ -1,14 +1,14 @@
-from modules.common import exponential_backoff
+from modules.common import paginate
 
 def list_opensearch_clusters(session):
     client = session.client('opensearch')
-    domains = exponential_backoff(client.list_domain_names).get("DomainNames", [])
+    domains = paginate(client, "list_domain_names", "DomainNames")
 
     result = []
 
     for domain in domains:
         domain_name = domain.get("DomainName", "-")
-        domain_info = exponential_backoff(client.describe_domain, DomainName=domain_name).get("DomainStatus", {})
+        domain_info = client.describe_domain(DomainName=domain_name).get("DomainStatus", {})
 
         result.append({
             "Domain Name": domain_name,
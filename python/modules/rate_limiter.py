@@ -0,0 +1,139 @@
+import time
+import threading
+from modules.common import THROTTLING_ERROR_CODES
+
+class TokenBucket:
+    """Token bucket whose refill rate follows AIMD on throttle responses.
+
+    Every success adds ``increase`` requests/second at most once per second;
+    every throttle halves the rate, at most once per ``cooldown`` seconds so
+    one burst of throttles counts as a single congestion signal.
+    """
+
+    def __init__(self, rate=10.0, min_rate=0.5, max_rate=100.0, increase=1.0, cooldown=1.0):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.cooldown = cooldown
+        self.tokens = rate
+        self.calls = 0
+        self.throttles = 0
+        self._updated = time.monotonic()
+        self._last_increase = self._updated
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.rate, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    self.calls += 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_increase >= 1.0:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+                self._last_increase = now
+
+    def on_throttle(self):
+        with self._lock:
+            self.throttles += 1
+            now = time.monotonic()
+            if now - self._last_decrease >= self.cooldown:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self.tokens = min(self.tokens, 0)
+                self._last_decrease = now
+                self._last_increase = now
+
+# Services with a documented per-account quota: start there and never probe above it
+SERVICE_BUCKETS = {
+    'route53': {'rate': 5.0, 'max_rate': 5.0}
+}
+
+# Services whose quota covers the whole account, not one region: all regions share one bucket
+GLOBAL_SERVICES = {'route53'}
+
+class AdaptiveRateLimiter:
+    """Process-wide limiter with one TokenBucket per (account, region, service).
+
+    Services in ``GLOBAL_SERVICES`` get one bucket per account, under the
+    region ``'global'``, whichever region their clients were created in.
+
+    ``install`` hooks a boto3 session's event system, so every client created
+    from that session afterwards (in any thread) waits for a token before each
+    HTTP attempt, botocore's own retries included, and reports throttled
+    attempts back to the shared bucket. The account is identified by the
+    session's profile, which maps one-to-one onto an SSO account in this tool.
+    """
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, account, region, service):
+        key = (account, 'global' if service in GLOBAL_SERVICES else region, service)
+        with self._lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(**SERVICE_BUCKETS.get(service, {}))
+            return self._buckets[key]
+
+    def install(self, session):
+        if getattr(session, 'rate_limiter', None) is self:
+            return session
+        account = session.profile_name
+
+        def bucket_for(model, context):
+            return self.bucket(account, context.get('client_region'), model.service_model.service_name)
+
+        def before_call(model, context, **kwargs):
+            # The context travels with every attempt of this call
+            context['rate_limit_bucket'] = bucket_for(model, context)
+
+        def request_created(request, **kwargs):
+            # Emitted once per attempt, before signing
+            bucket = getattr(request, 'context', {}).get('rate_limit_bucket')
+            if bucket is not None:
+                bucket.acquire()
+
+        def after_call(parsed, model, context, **kwargs):
+            if parsed.get('Error', {}).get('Code') not in THROTTLING_ERROR_CODES:
+                bucket_for(model, context).on_success()
+
+        def needs_retry(operation, request_dict, response=None, **kwargs):
+            if response and response[1].get('Error', {}).get('Code') in THROTTLING_ERROR_CODES:
+                bucket_for(operation, request_dict.get('context', {})).on_throttle()
+
+        session.events.register('before-call', before_call)
+        session.events.register('request-created', request_created)
+        session.events.register('after-call', after_call)
+        session.events.register('needs-retry', needs_retry)
+        session.rate_limiter = self
+        return session
+
+    def snapshot(self):
+        with self._lock:
+            buckets = dict(self._buckets)
+        return [
+            {
+                'Account': account,
+                'Region': region,
+                'Service': service,
+                'Rate (req/s)': round(bucket.rate, 2),
+                'Calls': bucket.calls,
+                'Throttles': bucket.throttles
+            }
+            for (account, region, service), bucket in sorted(buckets.items(), key=lambda item: tuple(map(str, item[0])))
+        ]
+
+RATE_LIMITER = AdaptiveRateLimiter()
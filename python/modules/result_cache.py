@@ -0,0 +1,118 @@
+import json
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+class ResultCache:
+    """TTL cache for rendered /api/<resource> payloads with stale-while-revalidate.
+
+    Entries younger than their TTL are served as-is. Entries past the TTL but
+    within ``max_stale`` seconds are served immediately while one background
+    reload refreshes them; older entries are reloaded in the request. Memory is
+    bounded by ``max_bytes`` of JSON-encoded payload, evicting least recently
+    used entries first. Loader errors are never cached. On a miss, an optional
+    ``fallback`` (e.g. the last on-disk snapshot) is served as stale while the
+    loader runs in the background.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_stale=3600, refresh_workers=4):
+        self.max_bytes = max_bytes
+        self.max_stale = max_stale
+        self.size = 0
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers)
+
+    def get(self, key, ttl, loader, refresh=False, fallback=None):
+        """Return (payload, fetched_at, stale) for key, calling loader() when needed."""
+        if not refresh:
+            with self._lock:
+                missing = key not in self._entries
+            if missing and fallback is not None:
+                seeded = fallback()
+                if seeded is not None:
+                    payload, fetched_at = seeded
+                    self._store(key, payload, fetched_at, replace=False)
+                    with self._lock:
+                        if key not in self._in_flight:
+                            self._start_load(key, loader, background=True)
+                    return payload, fetched_at, True
+
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    payload, fetched_at, _ = entry
+                    age = time.time() - fetched_at
+                    if age <= ttl:
+                        return payload, fetched_at, False
+                    # An entry already being reloaded (e.g. a seeded snapshot) is served regardless of age
+                    if age <= ttl + self.max_stale or key in self._in_flight:
+                        if key not in self._in_flight:
+                            self._start_load(key, loader, background=True)
+                        return payload, fetched_at, True
+        payload, fetched_at = self._load(key, loader)
+        return payload, fetched_at, False
+
+    def invalidate(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.size -= entry[2]
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self.size, 'max_bytes': self.max_bytes,
+                    'refreshing': len(self._in_flight)}
+
+    def _load(self, key, loader):
+        # Concurrent misses on one key share a single loader call
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self._start_load(key, loader, background=False)
+                owner = True
+            else:
+                owner = False
+        if owner:
+            self._run(key, loader, future)
+        return future.result()
+
+    def _start_load(self, key, loader, background):
+        # Caller holds self._lock
+        future = Future()
+        self._in_flight[key] = future
+        if background:
+            self._executor.submit(self._run, key, loader, future)
+        return future
+
+    def _run(self, key, loader, future):
+        try:
+            payload = loader()
+            fetched_at = time.time()
+            self._store(key, payload, fetched_at)
+            future.set_result((payload, fetched_at))
+        except Exception as e:
+            print(f"[ERROR] Cache reload of {key} failed: {e}")
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _store(self, key, payload, fetched_at, replace=True):
+        size = len(json.dumps(payload, default=str))
+        with self._lock:
+            if not replace and key in self._entries:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= old[2]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (payload, fetched_at, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= evicted[2]
@@ -1,66 +1,82 @@
 import pandas as pd
-from modules.common import exponential_backoff
+from concurrent.futures import ThreadPoolExecutor
+from modules.common import cached_call, cached_derive
+
+# Zones whose record sets are fetched at the same time; the route53 rate limiter bucket
+# (5 requests/second per account) paces the actual calls
+ROUTE53_WORKERS = 8
 
 def sanitize_sheet_name(zone_name):
     name = zone_name.replace('.', '_')
     return name[:28] + "..." if len(name) > 31 else name
 
+def zone_id_of(zone):
+    return zone['Id'].split('/')[-1]
+
+def zone_summary(zone):
+    return {
+        "Hosted zone name": zone['Name'],
+        "Type": "Private" if zone['Config']['PrivateZone'] else "Public",
+        "Record count": zone.get('ResourceRecordSetCount', '-'),
+        "Description": zone['Config'].get('Comment', '-')
+    }
+
+def record_row(record):
+    alias = 'AliasTarget' in record
+    value = "-"
+    if 'ResourceRecords' in record:
+        value = ", ".join(r['Value'] for r in record['ResourceRecords'])
+    elif alias:
+        value = record['AliasTarget']['DNSName']
+    return {
+        "Record name": record['Name'],
+        "Type": record['Type'],
+        "Routing policy": "Simple",
+        "Differentiator": "-",
+        "Alias": "Yes" if alias else "No",
+        "Value / Route traffic to": value,
+        "TTL (seconds)": record.get('TTL', '-'),
+        "Health check ID": record.get('HealthCheckId', '-'),
+        "Evaluate target health": record.get('AliasTarget', {}).get('EvaluateTargetHealth', '-') if alias else '-'
+    }
+
 def list_route53_zones(session):
-    client = session.client('route53')
-    zones = exponential_backoff(client.list_hosted_zones)['HostedZones']
-    zone_summary = []
-    for z in zones:
-        zone_summary.append({
-            "Hosted zone name": z['Name'],
-            "Type": "Private" if z['Config']['PrivateZone'] else "Public",
-            "Record count": z.get('ResourceRecordSetCount', '-'),
-            "Description": z['Config'].get('Comment', '-')
-        })
-    return zones, pd.DataFrame(zone_summary)
+    # list_hosted_zones pages through every zone (100 per page)
+    zones = cached_call(session, 'route53', 'list_hosted_zones')['HostedZones']
+    return zones
 
 def list_zone_record_sets(session, zone_id):
-    client = session.client('route53')
-    paginator = client.get_paginator('list_resource_record_sets')
-    records = []
-    for page in paginator.paginate(HostedZoneId=zone_id):
-        for record in page['ResourceRecordSets']:
-            alias = 'AliasTarget' in record
-            value = "-"
-            if 'ResourceRecords' in record:
-                value = ", ".join(r['Value'] for r in record['ResourceRecords'])
-            elif alias:
-                value = record['AliasTarget']['DNSName']
-            records.append({
-                "Record name": record['Name'],
-                "Type": record['Type'],
-                "Routing policy": "Simple",
-                "Differentiator": "-",
-                "Alias": "Yes" if alias else "No",
-                "Value / Route traffic to": value,
-                "TTL (seconds)": record.get('TTL', '-'),
-                "Health check ID": record.get('HealthCheckId', '-'),
-                "Evaluate target health": record.get('AliasTarget', {}).get('EvaluateTargetHealth', '-') if alias else '-'
-            })
-    return pd.DataFrame(records)
+    record_sets = cached_call(session, 'route53', 'list_resource_record_sets', HostedZoneId=zone_id)
+    return [record_row(record) for record in record_sets['ResourceRecordSets']]
+
+def fetch_zone_records(session):
+    """(zones, {zone ID: record rows}), fetched once per run for both Route53 views."""
+    def build(session):
+        zones = list_route53_zones(session)
+        zone_ids = [zone_id_of(zone) for zone in zones]
+        with ThreadPoolExecutor(max_workers=ROUTE53_WORKERS) as executor:
+            records = dict(zip(zone_ids, executor.map(lambda zone_id: list_zone_record_sets(session, zone_id), zone_ids)))
+        return zones, records
+
+    return cached_derive(session, 'route53-records', build)
 
 def list_route53(session):
-    zones, _ = list_route53_zones(session)
+    zones, records = fetch_zone_records(session)
     result = []
 
     for z in zones:
-        zone_id = z['Id'].split('/')[-1]
-        zone_name = z['Name']
-        zone_type = "Private" if z['Config']['PrivateZone'] else "Public"
-        record_count = z.get('ResourceRecordSetCount', '-')
-        description = z['Config'].get('Comment', '-')
+        zone_id = zone_id_of(z)
+        zone = {
+            "Zone Name": z['Name'],
+            "Zone ID": zone_id,
+            "Zone Type": "Private" if z['Config']['PrivateZone'] else "Public",
+            "Record Count": z.get('ResourceRecordSetCount', '-'),
+            "Description": z['Config'].get('Comment', '-')
+        }
 
         # Add zone summary as a resource
         result.append({
-            "Zone Name": zone_name,
-            "Zone ID": zone_id,
-            "Zone Type": zone_type,
-            "Record Count": record_count,
-            "Description": description,
+            **zone,
             "Record Name": "-",
             "Record Type": "-",
             "Record Value": "-",
@@ -70,14 +86,9 @@ def list_route53(session):
         })
 
         # Add each record as a resource
-        records_df = list_zone_record_sets(session, zone_id)
-        for _, row in records_df.iterrows():
+        for row in records[zone_id]:
             result.append({
-                "Zone Name": zone_name,
-                "Zone ID": zone_id,
-                "Zone Type": zone_type,
-                "Record Count": record_count,
-                "Description": description,
+                **zone,
                 "Record Name": row["Record name"],
                 "Record Type": row["Type"],
                 "Record Value": row["Value / Route traffic to"],
@@ -89,14 +100,11 @@ def list_route53(session):
     return result
 
 def fetch_route53_data(session):
-    zones, summary_df = list_route53_zones(session)
-    sheet_dict = {"Hosted Zones": summary_df}
+    zones, records = fetch_zone_records(session)
+    sheet_dict = {"Hosted Zones": pd.DataFrame([zone_summary(zone) for zone in zones])}
 
     for zone in zones:
-        zone_id = zone['Id'].split('/')[-1]
-        zone_name = zone['Name'].rstrip('.')
-        sheet_name = sanitize_sheet_name(zone_name)
-        records_df = list_zone_record_sets(session, zone_id)
-        sheet_dict[sheet_name] = records_df
+        sheet_name = sanitize_sheet_name(zone['Name'].rstrip('.'))
+        sheet_dict[sheet_name] = pd.DataFrame(records[zone_id_of(zone)])
 
-    return sheet_dict
\ No newline at end of file
+    return sheet_dict
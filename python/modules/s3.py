@@ -1,127 +1,182 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
 from botocore.exceptions import ClientError
-from modules.common import exponential_backoff
+from modules.common import fetch_all
+from modules.fingerprint import ENRICHMENT_CACHE, fingerprint
+
+# Global cap on in-flight per-bucket S3 calls, shared by every collection
+S3_MAX_IN_FLIGHT = int(os.environ.get('S3_MAX_IN_FLIGHT', '16'))
+s3_in_flight = threading.BoundedSemaphore(S3_MAX_IN_FLIGHT)
+
+def s3_call(func, **kwargs):
+    with s3_in_flight:
+        return func(**kwargs)
+
+def resolve_bucket_region(s3_client, bucket):
+    # list_buckets already returns BucketRegion on recent APIs
+    if bucket.get('BucketRegion'):
+        return bucket['BucketRegion']
+    try:
+        location = s3_call(s3_client.get_bucket_location, Bucket=bucket['Name'])
+        region = location['LocationConstraint'] if location['LocationConstraint'] else 'us-east-1'
+        return 'eu-west-1' if region == 'EU' else region
+    except ClientError as e:
+        print(f"Error retrieving location for bucket {bucket['Name']}: {e}")
+        return "Unknown"
+
+def describe_bucket(s3_client, bucket, region):
+    bucket_name = bucket['Name']
+    creation_date = bucket['CreationDate'].strftime("%Y-%m-%d %H:%M:%S")
+
+    # Additional bucket information
+    versioning = "Disabled"
+    encryption = "Not Configured"
+    block_public_access = "Unknown"
+    static_web_hosting = "Disabled"
+    bucket_policy = "-"
+    cors = "-"
+    lifecycle_expire_days = "-"
+    tags_parsed = "-"
+
+    try:
+        # Get versioning status
+        versioning_status = s3_call(s3_client.get_bucket_versioning, Bucket=bucket_name)
+        versioning = versioning_status.get('Status', 'Disabled')
+    except ClientError as e:
+        print(f"Error retrieving versioning status for bucket {bucket_name}: {e}")
+
+    try:
+        # Get encryption status
+        encryption_status = s3_call(s3_client.get_bucket_encryption, Bucket=bucket_name)
+        rules = encryption_status['ServerSideEncryptionConfiguration']['Rules']
+        encryption = ', '.join([rule['ApplyServerSideEncryptionByDefault']['SSEAlgorithm'] for rule in rules])
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ServerSideEncryptionConfigurationNotFoundError':
+            encryption = 'Not Configured'
+        else:
+            print(f"Error retrieving encryption status for bucket {bucket_name}: {e}")
+
+    try:
+        # Get block public access settings
+        public_access_status = s3_call(s3_client.get_bucket_acl, Bucket=bucket_name)
+        grants = public_access_status.get('Grants', [])
+        block_public_access = 'Blocked' if all(grant['Grantee']['Type'] != 'Group' or grant['Grantee'].get('URI') != 'http://acs.amazonaws.com/groups/global/AllUsers' for grant in grants) else 'Not Fully Blocked'
+    except ClientError as e:
+        print(f"Error retrieving public access block status for bucket {bucket_name}: {e}")
+
+    try:
+        # Get static website hosting status
+        s3_call(s3_client.get_bucket_website, Bucket=bucket_name)
+        static_web_hosting = 'Enabled'
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'NoSuchWebsiteConfiguration':
+            static_web_hosting = 'Disabled'
+        else:
+            print(f"Error retrieving static website hosting status for bucket {bucket_name}: {e}")
+
+    try:
+        # Get bucket policy
+        s3_call(s3_client.get_bucket_policy, Bucket=bucket_name)
+        bucket_policy = 'Exists'
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'NoSuchBucketPolicy':
+            bucket_policy = '-'
+        else:
+            print(f"Error retrieving bucket policy for bucket {bucket_name}: {e}")
+
+    try:
+        # Get CORS configuration
+        s3_call(s3_client.get_bucket_cors, Bucket=bucket_name)
+        cors = 'Configured'
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'NoSuchCORSConfiguration':
+            cors = '-'
+        else:
+            print(f"Error retrieving CORS configuration for bucket {bucket_name}: {e}")
+
+    try:
+        # Get lifecycle configuration
+        lifecycle_status = s3_call(s3_client.get_bucket_lifecycle_configuration, Bucket=bucket_name)
+        rules = lifecycle_status.get('Rules', [])
+        expire_days = [rule['Expiration']['Days'] for rule in rules if 'Expiration' in rule]
+        lifecycle_expire_days = ', '.join(map(str, expire_days)) if expire_days else '-'
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'NoSuchLifecycleConfiguration':
+            lifecycle_expire_days = '-'
+        else:
+            print(f"Error retrieving lifecycle configuration for bucket {bucket_name}: {e}")
+
+    try:
+        # Get bucket tags
+        tagging_status = s3_call(s3_client.get_bucket_tagging, Bucket=bucket_name)
+        tags = tagging_status.get('TagSet', [])
+        tags_parsed = ', '.join([f"{tag['Key']}: {tag['Value']}" for tag in tags])
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'NoSuchTagSet':
+            tags_parsed = '-'
+        else:
+            print(f"Error retrieving tags for bucket {bucket_name}: {e}")
+
+    return {
+        'Bucket Name': bucket_name,
+        'Creation Date': creation_date,
+        'Region': region,
+        'Block All Public Access': block_public_access,
+        'Versioning': versioning,
+        'Encryption': encryption,
+        'Static Web Hosting': static_web_hosting,
+        'Bucket Policy': bucket_policy,
+        'CORS': cors,
+        'Lifecycle Expire Days': lifecycle_expire_days,
+        'Tag': tags_parsed
+    }
+
+def iter_s3_buckets(session):
+    s3_config = Config(max_pool_connections=S3_MAX_IN_FLIGHT)
+    s3_client = session.client('s3', config=s3_config)
+    buckets = fetch_all(s3_client, 'list_buckets')['Buckets']
+    ENRICHMENT_CACHE.prune(session, 's3', [bucket['Name'] for bucket in buckets])
+
+    # One client per bucket region, so follow-up calls skip the cross-region redirect
+    regional_clients = {session.region_name: s3_client}
+    clients_lock = threading.Lock()
+
+    def client_for(region):
+        if region == "Unknown":
+            return s3_client
+        with clients_lock:
+            if region not in regional_clients:
+                regional_clients[region] = session.client('s3', region_name=region, config=s3_config)
+            return regional_clients[region]
+
+    def probe_bucket(bucket):
+        region = resolve_bucket_region(s3_client, bucket)
+        return describe_bucket(client_for(region), bucket, region)
+
+    def safe_describe_bucket(bucket):
+        try:
+            # The nine probes are only re-run for new or changed buckets
+            return dict(ENRICHMENT_CACHE.enrich(
+                session, 's3', bucket['Name'],
+                fingerprint(bucket, 'Name', 'CreationDate', 'BucketRegion'),
+                lambda: probe_bucket(bucket)
+            ))
+        except Exception as e:
+            print(f"Error retrieving details for bucket {bucket['Name']}: {e}")
+            return None
+
+    # Probes fan out across the pool; rows are yielded in bucket order as they finish
+    with ThreadPoolExecutor(max_workers=S3_MAX_IN_FLIGHT) as executor:
+        for row in executor.map(safe_describe_bucket, buckets):
+            if row is not None:
+                yield row
 
 def list_s3_buckets(session):
     s3_data = []
     try:
-        s3_client = session.client('s3')
-        buckets = exponential_backoff(s3_client.list_buckets)
-
-        for bucket in buckets['Buckets']:
-            bucket_name = bucket['Name']
-            creation_date = bucket['CreationDate'].strftime("%Y-%m-%d %H:%M:%S")
-
-            # Additional bucket information
-            region = "Unknown"
-            versioning = "Disabled"
-            encryption = "Not Configured"
-            block_public_access = "Unknown"
-            static_web_hosting = "Disabled"
-            bucket_policy = "-"
-            cors = "-"
-            lifecycle_expire_days = "-"
-            tags_parsed = "-"
-
-            try:
-                # Get bucket location (region)
-                location = exponential_backoff(s3_client.get_bucket_location, Bucket=bucket_name)
-                region = location['LocationConstraint'] if location['LocationConstraint'] else 'us-east-1'
-            except ClientError as e:
-                print(f"Error retrieving location for bucket {bucket_name}: {e}")
-
-            try:
-                # Get versioning status
-                versioning_status = exponential_backoff(s3_client.get_bucket_versioning, Bucket=bucket_name)
-                versioning = versioning_status.get('Status', 'Disabled')
-            except ClientError as e:
-                print(f"Error retrieving versioning status for bucket {bucket_name}: {e}")
-
-            try:
-                # Get encryption status
-                encryption_status = exponential_backoff(s3_client.get_bucket_encryption, Bucket=bucket_name)
-                rules = encryption_status['ServerSideEncryptionConfiguration']['Rules']
-                encryption = ', '.join([rule['ApplyServerSideEncryptionByDefault']['SSEAlgorithm'] for rule in rules])
-            except ClientError as e:
-                if e.response['Error']['Code'] == 'ServerSideEncryptionConfigurationNotFoundError':
-                    encryption = 'Not Configured'
-                else:
-                    print(f"Error retrieving encryption status for bucket {bucket_name}: {e}")
-
-            try:
-                # Get block public access settings
-                public_access_status = exponential_backoff(s3_client.get_bucket_acl, Bucket=bucket_name)
-                grants = public_access_status.get('Grants', [])
-                block_public_access = 'Blocked' if all(grant['Grantee']['Type'] != 'Group' or grant['Grantee'].get('URI') != 'http://acs.amazonaws.com/groups/global/AllUsers' for grant in grants) else 'Not Fully Blocked'
-            except ClientError as e:
-                print(f"Error retrieving public access block status for bucket {bucket_name}: {e}")
-
-            try:
-                # Get static website hosting status
-                s3_client.get_bucket_website(Bucket=bucket_name)
-                static_web_hosting = 'Enabled'
-            except ClientError as e:
-                if e.response['Error']['Code'] == 'NoSuchWebsiteConfiguration':
-                    static_web_hosting = 'Disabled'
-                else:
-                    print(f"Error retrieving static website hosting status for bucket {bucket_name}: {e}")
-
-            try:
-                # Get bucket policy
-                exponential_backoff(s3_client.get_bucket_policy, Bucket=bucket_name)
-                bucket_policy = 'Exists'
-            except ClientError as e:
-                if e.response['Error']['Code'] == 'NoSuchBucketPolicy':
-                    bucket_policy = '-'
-                else:
-                    print(f"Error retrieving bucket policy for bucket {bucket_name}: {e}")
-
-            try:
-                # Get CORS configuration
-                exponential_backoff(s3_client.get_bucket_cors, Bucket=bucket_name)
-                cors = 'Configured'
-            except ClientError as e:
-                if e.response['Error']['Code'] == 'NoSuchCORSConfiguration':
-                    cors = '-'
-                else:
-                    print(f"Error retrieving CORS configuration for bucket {bucket_name}: {e}")
-
-            try:
-                # Get lifecycle configuration
-                lifecycle_status = exponential_backoff(s3_client.get_bucket_lifecycle_configuration, Bucket=bucket_name)
-                rules = lifecycle_status.get('Rules', [])
-                expire_days = [rule['Expiration']['Days'] for rule in rules if 'Expiration' in rule]
-                lifecycle_expire_days = ', '.join(map(str, expire_days)) if expire_days else '-'
-            except ClientError as e:
-                if e.response['Error']['Code'] == 'NoSuchLifecycleConfiguration':
-                    lifecycle_expire_days = '-'
-                else:
-                    print(f"Error retrieving lifecycle configuration for bucket {bucket_name}: {e}")
-
-            try:
-                # Get bucket tags
-                tagging_status = exponential_backoff(s3_client.get_bucket_tagging, Bucket=bucket_name)
-                tags = tagging_status.get('TagSet', [])
-                tags_parsed = ', '.join([f"{tag['Key']}: {tag['Value']}" for tag in tags])
-            except ClientError as e:
-                if e.response['Error']['Code'] == 'NoSuchTagSet':
-                    tags_parsed = '-'
-                else:
-                    print(f"Error retrieving tags for bucket {bucket_name}: {e}")
-
-            # Append the gathered data to the list
-            s3_data.append({
-                'Bucket Name': bucket_name,
-                'Creation Date': creation_date,
-                'Region': region,
-                'Block All Public Access': block_public_access,
-                'Versioning': versioning,
-                'Encryption': encryption,
-                'Static Web Hosting': static_web_hosting,
-                'Bucket Policy': bucket_policy,
-                'CORS': cors,
-                'Lifecycle Expire Days': lifecycle_expire_days,
-                'Tag': tags_parsed
-            })
+        s3_data.extend(iter_s3_buckets(session))
     except ClientError as e:
         print(f"Error retrieving S3 buckets: {e}")
     return s3_data
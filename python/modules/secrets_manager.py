@@ -1,8 +1,8 @@
-from modules.common import exponential_backoff
+from modules.common import paginate
 
 def list_secrets_manager(session):
     client = session.client('secretsmanager')
-    secrets = exponential_backoff(client.list_secrets).get("SecretList", [])
+    secrets = paginate(client, "list_secrets", "SecretList")
 
     result = []
 
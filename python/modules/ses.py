@@ -1,14 +1,14 @@
-from modules.common import exponential_backoff
+from modules.common import paginate
 
 def list_ses_identities(session):
     client = session.client('ses')
-    identities = exponential_backoff(client.list_identities).get("Identities", [])
+    identities = paginate(client, "list_identities", "Identities")
 
     result = []
 
     for identity in identities:
-        attrs = exponential_backoff(client.get_identity_verification_attributes, Identities=[identity]).get("VerificationAttributes", {}).get(identity, {})
-        dkim_attrs = exponential_backoff(client.get_identity_dkim_attributes, Identities=[identity]).get("DkimAttributes", {}).get(identity, {})
+        attrs = client.get_identity_verification_attributes(Identities=[identity]).get("VerificationAttributes", {}).get(identity, {})
+        dkim_attrs = client.get_identity_dkim_attributes(Identities=[identity]).get("DkimAttributes", {}).get(identity, {})
 
         result.append({
             "Identity": identity,
@@ -1,20 +1,16 @@
-from modules.common import exponential_backoff
+from modules.common import cached_call
+from modules.attachment_index import attachment_index
 
 def list_security_groups(session):
-    ec2_client = session.client('ec2')
     security_groups = []
 
     try:
         # Retrieve all security groups
-        response = exponential_backoff(ec2_client.describe_security_groups)
+        response = cached_call(session, 'ec2', 'describe_security_groups')
         all_sgs = response['SecurityGroups']
 
-        # Find all security group IDs that are in use by ENIs
-        eni_response = exponential_backoff(ec2_client.describe_network_interfaces)
-        used_sg_ids = set()
-        for eni in eni_response['NetworkInterfaces']:
-            for group in eni.get('Groups', []):
-                used_sg_ids.add(group['GroupId'])
+        # Security groups in use by ENIs, from the index shared with the SG detail view
+        index = attachment_index(session)
 
         for sg in all_sgs:
             security_group_name = sg.get('GroupName', '-')
@@ -22,7 +18,7 @@ def list_security_groups(session):
             description = sg.get('Description', '-')
             region = session.region_name
 
-            usage_flag = security_group_id in used_sg_ids
+            usage_flag = index.is_used(security_group_id)
 
             # Extract the 'Name' tag if it exists, or use 'default' for default security groups
             name = '-'
@@ -1,19 +1,20 @@
-from modules.common import exponential_backoff
-import re
+from modules.common import cached_call
+from modules.attachment_index import attachment_index, RESOURCE_COLUMNS
+from modules.exposure import is_internet_wide
+import numpy as np
 import pandas as pd
 
 def fetch_all_sg_data(session):
-    ec2 = session.client('ec2')
     region = session.region_name
 
-    sg_data = exponential_backoff(ec2.describe_security_groups)
-    eni_data = exponential_backoff(ec2.describe_network_interfaces)
-    ec2_data = exponential_backoff(ec2.describe_instances)
+    sg_data = cached_call(session, 'ec2', 'describe_security_groups')
+    rule_data = cached_call(session, 'ec2', 'describe_security_group_rules', MaxResults=1000)
+    # Shared with list_security_groups: ENIs are parsed and classified once per collection
+    index = attachment_index(session)
 
-    ec2_name_map = build_ec2_name_map(ec2_data)
-
-    sg_summary = pd.DataFrame(map_sg_summary(region, sg_data, eni_data, ec2_name_map))
-    sg_rules = pd.DataFrame(map_sg_rules_with_resources(region, sg_data, eni_data, ec2_name_map))
+    sg_summary = pd.DataFrame(map_sg_summary(region, sg_data, index))
+    # Rules and attachments stay normalized; Details rows are expanded only when written out
+    sg_rules = map_sg_rules_with_resources(region, sg_data, rule_data, index)
     sg_findings = findings_rules_with_governance(sg_rules)
 
     return (
@@ -22,63 +23,18 @@ def fetch_all_sg_data(session):
         sg_findings
     )
 
-def build_ec2_name_map(ec2_data):
-    return {
-        inst.get("InstanceId"): next((tag.get("Value") for tag in inst.get("Tags", []) if tag.get("Key") == "Name"), "-")
-        for res in ec2_data.get("Reservations", [])
-        for inst in res.get("Instances", [])
-    }
-
-def infer_resource_type(description, interface_type):
-    desc = (description or '').lower()
-    if 'lambda' in desc: return 'Lambda'
-    if 'elb' in desc: return 'ELB'
-    if 'rds' in desc: return 'RDS'
-    if 'msk' in desc or 'kafka' in desc: return 'MSK'
-    if 'opensearch' in desc or 'es endpoint' in desc: return 'OpenSearch'
-    if 'efs' in desc or 'mount target' in desc: return 'EFS'
-    if 'nat gateway' in desc: return 'NAT Gateway'
-    if 'transit gateway' in desc or 'tgw' in desc: return 'Transit Gateway'
-    if 'vpce' in desc or 'vpc endpoint' in desc: return 'VPC Endpoint'
-    if 'redshift' in desc: return 'Redshift'
-    if 'global accelerator' in desc: return 'Global Accelerator'
-    if interface_type == 'interface': return 'EC2'
-    return 'Unknown'
-
-def map_sg_summary(region, sg_data, eni_data, ec2_name_map):
+def map_sg_summary(region, sg_data, index):
     sg_list = sg_data['SecurityGroups']
 
-    sg_to_resources = {}
-    for eni in eni_data['NetworkInterfaces']:
-        eni_id = eni.get('NetworkInterfaceId', '-')
-        private_ip = eni.get('PrivateIpAddress', '-')
-        description = eni.get('Description', '-')
-        interface_type = eni.get('InterfaceType', '-')
-        resource_id = eni.get('Attachment', {}).get('InstanceId') or description or '-'
-        resource_type = infer_resource_type(description, interface_type)
-        resource_name = ec2_name_map.get(resource_id, '-') if resource_type == 'EC2' else '-'
-
-        sg_info = {
-            'Resource ID': resource_id,
-            'Resource Type': resource_type,
-            'Resource Name': resource_name,
-            'ENI ID': eni_id,
-            'Private IP': private_ip
-        }
-
-        for group in eni.get('Groups', []):
-            sg_id = group['GroupId']
-            sg_to_resources.setdefault(sg_id, []).append(sg_info)
-
     result = []
     for sg in sg_list:
         sg_id = sg['GroupId']
         sg_name = next((tag['Value'] for tag in sg.get('Tags', []) if tag['Key'] == 'Name'), sg.get('GroupName', '-'))
         description = sg.get('Description', '-')
-        usage = sg_id in sg_to_resources
-        resources = sg_to_resources.get(sg_id, [{
+        usage = index.is_used(sg_id)
+        resources = index.resources(sg_id) or [{
             'Resource ID': '-', 'Resource Type': '-', 'Resource Name': '-', 'ENI ID': '-', 'Private IP': '-'
-        }])
+        }]
 
         for res in resources:
             result.append({
@@ -96,178 +52,245 @@ def map_sg_summary(region, sg_data, eni_data, ec2_name_map):
 
     return result
 
-def map_sg_rules_with_resources(region, sg_data, eni_data, ec2_name_map):
+RULE_COLUMNS = [
+    'Security Group Name', 'Security Group ID', 'SG Description', 'Region', 'Usage',
+    'Direction', 'Protocol', 'Port Range', 'Src Origin', 'Src Parsed', 'Des Origin', 'Des Parsed',
+    'Rules Src/Dst Description'
+]
+
+def compact(df):
+    # Repeated strings are stored once per table as categoricals
+    for column in df.columns[df.dtypes == object]:
+        df[column] = df[column].astype('category')
+    return df
+
+class SGRuleView:
+    """SG Details sheet kept as two normalized tables linked by Security Group ID.
+
+    ``rules`` holds one row per rule source, ``attachments`` one row per
+    (security group, ENI). The denormalized Details rows (every rule repeated
+    for every attached ENI) are only built by ``to_frame``, when a consumer
+    such as the Excel Details sheet or a file export needs them.
+    """
+
+    def __init__(self, rules, attachments):
+        self.rules = rules
+        self.attachments = attachments
+
+    @property
+    def columns(self):
+        return list(self.rules.columns) + RESOURCE_COLUMNS
+
+    def __len__(self):
+        # Rows of the expanded view: one per attachment, one for a group without any
+        attached = self.attachments['Security Group ID'].value_counts()
+        return int(self.rules['Security Group ID'].map(attached).fillna(1).sum()) if len(self.rules) else 0
+
+    @property
+    def empty(self):
+        return len(self.rules) == 0
+
+    def labeled(self, column, label):
+        # Same as inserting a label column in front of the expanded rows
+        if column in self.rules.columns:
+            return self
+        rules = self.rules.copy()
+        rules.insert(0, column, pd.Categorical([label] * len(rules)))
+        return SGRuleView(rules, self.attachments)
+
+    @classmethod
+    def concat(cls, views):
+        rules = pd.concat([view.rules for view in views], ignore_index=True)
+        # SG IDs are unique across accounts and regions; the same account reached through
+        # two profiles must not repeat every rule once per copy of its attachments
+        attachments = pd.concat([view.attachments for view in views], ignore_index=True).drop_duplicates()
+        return cls(compact(rules), compact(attachments.reset_index(drop=True)))
+
+    def to_frame(self):
+        details = self.rules.merge(self.attachments, on='Security Group ID', how='left', sort=False)
+        for column in RESOURCE_COLUMNS:
+            values = details[column]
+            if values.isna().any():
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    values = values.cat.add_categories([value for value in ['-'] if value not in values.cat.categories])
+                details[column] = values.fillna('-')
+        return details[self.columns]
+
+def rule_origin(rule):
+    # Source (inbound) or destination (outbound) of one describe_security_group_rules entry
+    if rule.get('CidrIpv4'):
+        return rule['CidrIpv4']
+    if rule.get('CidrIpv6'):
+        return rule['CidrIpv6']
+    if rule.get('ReferencedGroupInfo'):
+        return rule['ReferencedGroupInfo'].get('GroupId', '-')
+    return rule.get('PrefixListId', '-')
+
+def map_sg_rules(region, sg_data, rule_data, used_groups):
     sg_list = sg_data['SecurityGroups']
 
     sg_name_map = {
         sg['GroupId']: next((tag['Value'] for tag in sg.get('Tags', []) if tag['Key'] == 'Name'), sg.get('GroupName', '-'))
         for sg in sg_list
     }
+    sg_position = {sg['GroupId']: position for position, sg in enumerate(sg_list)}
+    sg_description = {sg['GroupId']: sg.get('Description', '-') for sg in sg_list}
+
+    ordered = []
+    for rule in rule_data['SecurityGroupRules']:
+        sg_id = rule.get('GroupId')
+        if sg_id not in sg_position:  # created after describe_security_groups ran
+            continue
+        direction = 'Outbound' if rule.get('IsEgress') else 'Inbound'
+        ordered.append(((sg_position[sg_id], direction == 'Outbound'), sg_id, direction, rule_origin(rule), rule))
+    # Groups in describe_security_groups order, inbound rules first (stable, so API order within)
+    ordered.sort(key=lambda item: item[0])
+
+    rows = []
+    for _, sg_id, direction, origin, rule in ordered:
+        protocol = rule.get('IpProtocol', '-')
+        if protocol == '-1':
+            protocol, from_port, to_port = 'all', '-', '-'
+        else:
+            from_port = rule.get('FromPort', '-')
+            to_port = rule.get('ToPort', '-')
+        port_range = f"{from_port}-{to_port}" if from_port != to_port else f"{from_port}"
+        parsed_name = sg_name_map.get(origin, origin)
+
+        rows.append({
+            'Security Group Name': sg_name_map[sg_id],
+            'Security Group ID': sg_id,
+            'SG Description': sg_description[sg_id],
+            'Region': region,
+            'Usage': sg_id in used_groups,
+            'Direction': direction,
+            'Protocol': protocol,
+            'Port Range': port_range,
+            'Src Origin': origin if direction == 'Inbound' else '-',
+            'Src Parsed': parsed_name if direction == 'Inbound' else '-',
+            'Des Origin': origin if direction == 'Outbound' else '-',
+            'Des Parsed': parsed_name if direction == 'Outbound' else '-',
+            'Rules Src/Dst Description': rule.get('Description', '-')
+        })
+    return compact(pd.DataFrame(rows, columns=RULE_COLUMNS))
+
+def map_sg_rules_with_resources(region, sg_data, rule_data, index):
+    return SGRuleView(map_sg_rules(region, sg_data, rule_data, index.groups), index.attachments())
+
+def finding(mask, text):
+    # text (a string or a Series of strings) where mask holds, "" elsewhere
+    return pd.Series(text, index=mask.index, dtype=object).where(mask, "")
+
+def join_findings(*columns):
+    # Row-wise ", ".join over finding columns, skipping empty strings
+    result = columns[0]
+    for column in columns[1:]:
+        separator = finding((result != "") & (column != ""), ", ")
+        result = result + separator + column
+    return result
 
-    eni_map = {}
-    for eni in eni_data['NetworkInterfaces']:
-        eni_id = eni.get('NetworkInterfaceId', '-')
-        private_ip = eni.get('PrivateIpAddress', '-')
-        description = eni.get('Description', '-')
-        interface_type = eni.get('InterfaceType', '-')
-        resource_id = eni.get('Attachment', {}).get('InstanceId') or description or '-'
-        resource_type = infer_resource_type(description, interface_type)
-        resource_name = ec2_name_map.get(resource_id, '-') if resource_type == 'EC2' else '-'
-
-        for group in eni.get('Groups', []):
-            sg_id = group['GroupId']
-            eni_map.setdefault(sg_id, []).append({
-                'ENI ID': eni_id,
-                'Private IP': private_ip,
-                'Resource ID': resource_id,
-                'Resource Type': resource_type,
-                'Resource Name': resource_name
-            })
+def internet_wide(values):
+    # Element-wise is_internet_wide over a Series of origins, parsing each distinct origin once
+    wide = {value: is_internet_wide(value) for value in values.unique()}
+    return values.map(wide).astype(bool)
 
-    result = []
+def covers_port(port_range, port):
+    # "22" or "20-25". Rules without ports ("-": all-protocol rules, or protocols such as ESP)
+    # and ICMP type/code ranges ("-1") never cover a port; Rule 1 matches all-protocol rules on Protocol
+    bounds = port_range.str.extract(r'^(\d+)(?:-(\d+))?$')
+    low = pd.to_numeric(bounds[0])
+    high = pd.to_numeric(bounds[1]).fillna(low)
+    return ((low <= port) & (high >= port)).fillna(False).astype(bool)
 
-    for sg in sg_list:
-        sg_id = sg['GroupId']
-        sg_name = sg_name_map.get(sg_id, '-')
-        description = sg.get('Description', '-')
-        usage_flag = sg_id in eni_map
-        attached_resources = eni_map.get(sg_id, [{
-            'ENI ID': '-', 'Private IP': '-', 'Resource ID': '-', 'Resource Type': '-', 'Resource Name': '-'
-        }])
-
-        def build_rule_rows(rules, direction):
-            rows = []
-            for rule in rules:
-                protocol = rule.get('IpProtocol', '-')
-                protocol = 'all' if protocol == '-1' else protocol
-                from_port = rule.get('FromPort', '-')
-                to_port = rule.get('ToPort', '-')
-                port_range = f"{from_port}-{to_port}" if from_port != to_port else f"{from_port}"
-
-                sources = []
-                sources.extend([(ip.get('CidrIp', '-'), ip.get('Description', '-')) for ip in rule.get('IpRanges', [])])
-                sources.extend([(ip.get('CidrIpv6', '-'), ip.get('Description', '-')) for ip in rule.get('Ipv6Ranges', [])])
-                sources.extend([(group.get('GroupId', '-'), group.get('Description', '-')) for group in rule.get('UserIdGroupPairs', [])])
-
-                for origin, origin_desc in sources:
-                    parsed_name = sg_name_map.get(origin, origin)
-                    for res in attached_resources:
-                        rows.append({
-                            'Security Group Name': sg_name,
-                            'Security Group ID': sg_id,
-                            'SG Description': description,
-                            'Region': region,
-                            'Usage': usage_flag,
-                            'Direction': direction,
-                            'Protocol': protocol,
-                            'Port Range': port_range,
-                            'Src Origin': origin if direction == 'Inbound' else '-',
-                            'Src Parsed': parsed_name if direction == 'Inbound' else '-',
-                            'Des Origin': origin if direction == 'Outbound' else '-',
-                            'Des Parsed': parsed_name if direction == 'Outbound' else '-',
-                            'Rules Src/Dst Description': origin_desc,
-                            'Resource Name': res['Resource Name'],
-                            'Resource ID': res['Resource ID'],
-                            'Resource Type': res['Resource Type'],
-                            'ENI ID': res['ENI ID'],
-                            'Private IP': res['Private IP']
-                        })
-            return rows
-
-        result.extend(build_rule_rows(sg.get('IpPermissions', []), 'Inbound'))
-        result.extend(build_rule_rows(sg.get('IpPermissionsEgress', []), 'Outbound'))
+def findings_rules_with_governance(sg_data):
+    # Findings never depend on the attached ENIs, so a rule view is checked rule by rule
+    df = sg_data.rules.copy() if isinstance(sg_data, SGRuleView) else pd.DataFrame(sg_data)
+    if df.empty:
+        return pd.DataFrame(columns=["Findings"])
+
+    direction = df["Direction"]
+    port = df["Port Range"].astype(str)
+    source = df["Src Origin"].astype(str)
+    source_name = df["Src Parsed"].astype(str)
+    destination = df["Des Origin"].astype(str)
+    destination_name = df["Des Parsed"].astype(str)
+    protocol = df["Protocol"].astype(str).str.lower()
+    sg_id = df["Security Group ID"]
+
+    inbound = direction == "Inbound"
+    outbound = direction == "Outbound"
+
+    # Rule 1: overly open to the internet (0.0.0.0/0 and any other wide public prefix, e.g. 0.0.0.0/1 or ::/0)
+    # on a port range that covers 22, or on all traffic. Prefix-list origins (pl-...) are never wide.
+    source_wide = internet_wide(source)
+    destination_wide = internet_wide(destination)
+    all_traffic = protocol.isin(["all", "-1"])
+    inbound_open = inbound & source_wide & (covers_port(port, 22) | all_traffic)
+    outbound_open = outbound & destination_wide & all_traffic
+
+    # Rule 2: unused SG
+    unused = df["Usage"].astype(str).str.strip().str.upper() == "FALSE"
+
+    # Rule 3: SG reference mismatch, answered from one (sg, direction, peer) index
+    # where peer is the Src Origin of inbound rules and the Des Origin of outbound rules
+    peer = np.where(inbound, df["Src Origin"], np.where(outbound, df["Des Origin"], None))
+    rule_index = pd.MultiIndex.from_arrays([sg_id, direction, peer]).unique()
+    # (sg, direction) pairs with a rule open to the internet
+    peer_wide = (inbound & source_wide) | (outbound & destination_wide)
+    wide_index = pd.MultiIndex.from_arrays([sg_id[peer_wide], direction[peer_wide]]).unique()
+
+    def has_rule(group_ids, rule_direction, peers):
+        lookup = pd.MultiIndex.from_arrays([group_ids, [rule_direction] * len(df), peers])
+        return pd.Series(lookup.isin(rule_index), index=df.index)
+
+    def is_open(group_ids, rule_direction):
+        lookup = pd.MultiIndex.from_arrays([group_ids, [rule_direction] * len(df)])
+        return pd.Series(lookup.isin(wide_index), index=df.index)
+
+    # --- Outbound: referencing a destination SG ---
+    outbound_ref = outbound & destination.str.startswith("sg-")
+    outbound_unmatched = outbound_ref & ~has_rule(destination, "Inbound", sg_id)
+    # Check if target SG is just open to 0.0.0.0/0
+    destination_open = is_open(destination, "Inbound")
+
+    # --- Inbound: referencing a source SG ---
+    inbound_ref = inbound & source.str.startswith("sg-")
+    inbound_unmatched = inbound_ref & ~has_rule(source, "Outbound", sg_id)
+    # Check if source SG is open to 0.0.0.0/0
+    source_open = is_open(source, "Outbound")
+
+    outbound_message = finding(
+        outbound_unmatched,
+        "Outbound references " + destination_name + " but no matching inbound"
+        + finding(destination_open, " (note: " + destination_name + " open to 0.0.0.0/0)")
+    )
+    inbound_message = finding(
+        inbound_unmatched,
+        "Inbound references " + source_name + " but no matching outbound"
+        + finding(source_open, " (note: " + source_name + " open to 0.0.0.0/0)")
+    )
 
-    return result
+    df["Findings"] = join_findings(
+        finding(inbound_open, "Inbound " + source + " open (22/ALL)"),
+        finding(outbound_open, "Outbound " + destination + " open (ALL)"),
+        finding(unused, "Unused SG"),
+        outbound_message,
+        inbound_message
+    )
 
-def findings_rules_with_governance(sg_data):
-    try:
-        df = pd.DataFrame(sg_data)
-
-        def analyze_sg(row):
-            findings = []
-            direction = row.get("Direction", "")
-            port = str(row.get("Port Range", ""))
-            source = str(row.get("Src Origin", ""))
-            source_name = str(row.get("Src Parsed", ""))
-            destination = str(row.get("Des Origin", ""))
-            destination_name = str(row.get("Des Parsed", ""))
-            protocol = str(row.get("Protocol", "")).lower()
-            sg_id = row.get("Security Group ID", "")
-
-            is_sg_source = source.startswith("sg-")
-            is_sg_dest = destination.startswith("sg-")
-
-            
-            # Rule 1: overly open to 0.0.0.0/0
-            if direction == "Inbound" and source == "0.0.0.0/0" and (
-                re.search(r"^22$|^22[-:]", port) or protocol == "all"
-            ):
-                findings.append("Inbound 0.0.0.0/0 open (22/ALL)")
-
-            if direction == "Outbound" and destination == "0.0.0.0/0" and protocol == "all":
-                findings.append("Outbound 0.0.0.0/0 open (ALL)")
-
-            # Rule 2: unused SG
-            if str(row.get("Usage", "")).strip().upper() == "FALSE":
-                findings.append("Unused SG")
-
-            # Rule 3: SG reference mismatch
-            # --- Outbound: referencing a destination SG ---
-            if direction == "Outbound" and is_sg_dest:
-                matched_inbound = (
-                    (df["Security Group ID"] == destination) &
-                    (df["Direction"] == "Inbound") &
-                    (df["Src Origin"] == sg_id)
-                )
-                if not matched_inbound.any():
-                    # Check if target SG is just open to 0.0.0.0/0
-                    open_inbound = (
-                        (df["Security Group ID"] == destination) &
-                        (df["Direction"] == "Inbound") &
-                        (df["Src Origin"] == "0.0.0.0/0")
-                    )
-                    if open_inbound.any():
-                        findings.append(f"Outbound references {destination_name} but no matching inbound (note: {destination_name} open to 0.0.0.0/0)")
-                    else:
-                        findings.append(f"Outbound references {destination_name} but no matching inbound")
-
-            # --- Inbound: referencing a source SG ---
-            if direction == "Inbound" and is_sg_source:
-                matched_outbound = (
-                    (df["Security Group ID"] == source) &
-                    (df["Direction"] == "Outbound") &
-                    (df["Des Origin"] == sg_id)
-                )
-                if not matched_outbound.any():
-                    # Check if source SG is open to 0.0.0.0/0
-                    open_outbound = (
-                        (df["Security Group ID"] == source) &
-                        (df["Direction"] == "Outbound") &
-                        (df["Des Origin"] == "0.0.0.0/0")
-                    )
-                    if open_outbound.any():
-                        findings.append(f"Inbound references {source_name} but no matching outbound (note: {source_name} open to 0.0.0.0/0)")
-                    else:
-                        findings.append(f"Inbound references {source_name} but no matching outbound")
-
-            return ", ".join(findings)
-
-
-        df["Findings"] = df.apply(analyze_sg, axis=1)
-        df_filtered = df[df["Findings"] != ""]
-        columns_to_drop = [
-            "Usage", "Region", "Src Origin", "Des Origin", 
-            "Resource Name", "Resource ID", "Resource Type", 
-            "ENI ID", "Private IP", "Security Group ID", "SG Description"
-        ]
-        df_filtered = df_filtered.drop(columns=[col for col in columns_to_drop if col in df_filtered.columns])
-        df_filtered = df_filtered.drop_duplicates()
-        cols = df_filtered.columns.tolist()
-        if "Findings" in cols:
-            cols.insert(0, cols.pop(cols.index("Findings")))
-            df_filtered = df_filtered[cols]
-
-        return df_filtered
-
-    except Exception as e:
-        return str(e), 500
\ No newline at end of file
+    df_filtered = df[df["Findings"] != ""]
+    columns_to_drop = [
+        "Usage", "Region", "Src Origin", "Des Origin", 
+        "Resource Name", "Resource ID", "Resource Type", 
+        "ENI ID", "Private IP", "Security Group ID", "SG Description"
+    ]
+    df_filtered = df_filtered.drop(columns=[col for col in columns_to_drop if col in df_filtered.columns])
+    df_filtered = df_filtered.drop_duplicates()
+    cols = df_filtered.columns.tolist()
+    if "Findings" in cols:
+        cols.insert(0, cols.pop(cols.index("Findings")))
+        df_filtered = df_filtered[cols]
+    categorical = df_filtered.columns[df_filtered.dtypes == 'category']
+    df_filtered = df_filtered.astype({column: object for column in categorical})
+
+    return df_filtered
@@ -0,0 +1,123 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+import pandas as pd
+from modules.sg_detail import SGRuleView, compact
+
+def encode_result(value):
+    # Collector output -> JSON-safe structure (lists of dicts, DataFrames, tuples and dicts of those)
+    if isinstance(value, pd.DataFrame):
+        return {'__dataframe__': json.loads(value.to_json(orient='split', date_format='iso', default_handler=str))}
+    if isinstance(value, SGRuleView):
+        # Stored normalized, like it is held in memory
+        return {'__sg_rules__': [encode_result(value.rules), encode_result(value.attachments)]}
+    if isinstance(value, tuple):
+        return {'__tuple__': [encode_result(item) for item in value]}
+    if isinstance(value, dict):
+        return {key: encode_result(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [encode_result(item) for item in value]
+    return value
+
+def decode_result(value):
+    if isinstance(value, dict):
+        if '__dataframe__' in value:
+            frame = value['__dataframe__']
+            return pd.DataFrame(frame['data'], columns=frame['columns'])
+        if '__sg_rules__' in value:
+            rules, attachments = (compact(decode_result(item)) for item in value['__sg_rules__'])
+            return SGRuleView(rules, attachments)
+        if '__tuple__' in value:
+            return tuple(decode_result(item) for item in value['__tuple__'])
+        return {key: decode_result(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode_result(item) for item in value]
+    return value
+
+class SnapshotStore:
+    """SQLite store of collector results keyed by (profile, region, resource, collected_at).
+
+    Results are zlib-compressed JSON. ``compact`` drops snapshots older than
+    ``retention`` seconds and keeps at most ``keep`` per key; the app runs it
+    at startup and a background thread every ``compact_every`` seconds, never
+    a saving thread. Connections are per thread, in WAL mode.
+    """
+
+    def __init__(self, path, retention=7 * 24 * 3600, keep=5, compact_every=6 * 3600, vacuum_idle=60):
+        self.path = path
+        self.retention = retention
+        self.keep = keep
+        self._last_save = 0.0
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    profile TEXT NOT NULL,
+                    region TEXT NOT NULL,
+                    resource TEXT NOT NULL,
+                    collected_at REAL NOT NULL,
+                    payload BLOB NOT NULL
+                )""")
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS snapshots_key
+                ON snapshots (profile, region, resource, collected_at DESC)""")
+        threading.Thread(target=self._compact_loop, args=(compact_every, vacuum_idle), daemon=True).start()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def save(self, profile, region, resource, result, collected_at=None):
+        payload = zlib.compress(json.dumps(encode_result(result), default=str).encode('utf-8'))
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO snapshots (profile, region, resource, collected_at, payload) VALUES (?, ?, ?, ?, ?)",
+                (profile, region, resource, collected_at or time.time(), payload))
+        self._last_save = time.monotonic()
+
+    def latest(self, profile, region, resource):
+        """Return (result, collected_at) of the newest snapshot, or None."""
+        row = self._connect().execute(
+            "SELECT payload, collected_at FROM snapshots WHERE profile = ? AND region = ? AND resource = ? "
+            "ORDER BY collected_at DESC LIMIT 1",
+            (profile, region, resource)).fetchone()
+        if row is None:
+            return None
+        return decode_result(json.loads(zlib.decompress(row[0]))), row[1]
+
+    def compact(self, vacuum=True):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM snapshots WHERE collected_at < ?", (time.time() - self.retention,))
+            conn.execute("""
+                DELETE FROM snapshots WHERE rowid IN (
+                    SELECT rowid FROM (
+                        SELECT rowid, ROW_NUMBER() OVER (
+                            PARTITION BY profile, region, resource ORDER BY collected_at DESC) AS position
+                        FROM snapshots)
+                    WHERE position > ?)""", (self.keep,))
+        if not vacuum:
+            return
+        try:
+            self._connect().execute("VACUUM")
+        except sqlite3.OperationalError as e:
+            # Another connection is mid-transaction; space is reclaimed next time
+            print(f"[WARN] Snapshot VACUUM skipped: {e}")
+
+    def _compact_loop(self, interval, idle):
+        while True:
+            time.sleep(interval)
+            # VACUUM rewrites the whole file and blocks writers, so it waits for a moment without
+            # saves; pages freed by the deletes are reused in the meantime
+            try:
+                self.compact(vacuum=time.monotonic() - self._last_save >= idle)
+            except sqlite3.Error as e:
+                # The loop keeps running; the next round retries
+                print(f"[WARN] Snapshot compaction failed: {e}")
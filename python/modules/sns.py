@@ -1,14 +1,14 @@
-from modules.common import exponential_backoff
+from modules.common import paginate
 
 def list_sns_topics(session):
     client = session.client('sns')
-    topics = exponential_backoff(client.list_topics).get("Topics", [])
+    topics = paginate(client, "list_topics", "Topics")
 
     result = []
 
     for topic in topics:
         topic_arn = topic.get("TopicArn", "-")
-        attrs = exponential_backoff(client.get_topic_attributes, TopicArn=topic_arn).get("Attributes", {})
+        attrs = client.get_topic_attributes(TopicArn=topic_arn).get("Attributes", {})
 
         result.append({
             "Topic ARN": topic_arn,
@@ -1,15 +1,14 @@
-from modules.common import exponential_backoff
+from modules.common import paginate
 from datetime import datetime
 
 def list_sqs_queues(session):
     client = session.client('sqs')
-    queue_urls = exponential_backoff(client.list_queues).get("QueueUrls", [])
+    queue_urls = paginate(client, "list_queues", "QueueUrls")
 
     result = []
 
     for queue_url in queue_urls:
-        attrs = exponential_backoff(
-            client.get_queue_attributes,
+        attrs = client.get_queue_attributes(
             QueueUrl=queue_url,
             AttributeNames=['All']
         ).get("Attributes", {})
@@ -1,5 +1,5 @@
 from botocore.exceptions import ClientError
-from modules.common import exponential_backoff
+from modules.common import cached_call
 
 def get_tag_value(tags, key):
     for tag in tags:
@@ -7,12 +7,37 @@ def get_tag_value(tags, key):
             return tag['Value']
     return 'Unnamed'
 
+def build_route_table_index(route_tables):
+    # Subnet ID -> explicitly associated route tables, VPC ID -> main route table
+    subnet_route_tables = {}
+    main_route_tables = {}
+    for route_table in route_tables:
+        for association in route_table.get('Associations', []):
+            if association.get('SubnetId'):
+                subnet_route_tables.setdefault(association['SubnetId'], []).append(route_table)
+            elif association.get('Main'):
+                main_route_tables[route_table['VpcId']] = route_table
+    return subnet_route_tables, main_route_tables
+
+def build_network_acl_index(network_acls):
+    # Subnet ID -> associated network ACLs
+    subnet_network_acls = {}
+    for acl in network_acls:
+        for association in acl.get('Associations', []):
+            if association.get('SubnetId'):
+                subnet_network_acls.setdefault(association['SubnetId'], []).append(acl)
+    return subnet_network_acls
+
 def list_subnets(session):
     subnet_data = []
     try:
-        ec2_client = session.client('ec2')
-        
-        subnets = exponential_backoff(ec2_client.describe_subnets)['Subnets']
+        subnets = cached_call(session, 'ec2', 'describe_subnets')['Subnets']
+        subnet_route_tables, main_route_tables = build_route_table_index(
+            cached_call(session, 'ec2', 'describe_route_tables').get('RouteTables', [])
+        )
+        subnet_network_acls = build_network_acl_index(
+            cached_call(session, 'ec2', 'describe_network_acls').get('NetworkAcls', [])
+        )
         
         for subnet in subnets:
             subnet_id = subnet['SubnetId']
@@ -24,11 +49,10 @@ def list_subnets(session):
             # Get Subnet Name
             subnet_name = get_tag_value(subnet.get('Tags', []), 'Name')
             
-            # Route Tables
-            route_tables = exponential_backoff(
-                ec2_client.describe_route_tables,
-                Filters=[{'Name': 'association.subnet-id', 'Values': [subnet_id]}]
-            ).get('RouteTables', [])
+            # Route Tables (subnets without an explicit association use the VPC main route table)
+            route_tables = subnet_route_tables.get(subnet_id)
+            if not route_tables:
+                route_tables = [main_route_tables[vpc_id]] if vpc_id in main_route_tables else []
             
             route_table_ids = ', '.join([rtb['RouteTableId'] for rtb in route_tables]) if route_tables else 'None'
             route_table_names = ', '.join([get_tag_value(rtb.get('Tags', []), 'Name') for rtb in route_tables]) if route_tables else 'None'
@@ -48,10 +72,7 @@ def list_subnets(session):
             igw_nat_tg_str = ', '.join(sorted(igw_nat_tg)) if igw_nat_tg else 'None'
             
             # Network ACLs
-            network_acls = exponential_backoff(
-                ec2_client.describe_network_acls,
-                Filters=[{'Name': 'association.subnet-id', 'Values': [subnet_id]}]
-            ).get('NetworkAcls', [])
+            network_acls = subnet_network_acls.get(subnet_id, [])
             
             network_acl_ids = ', '.join([acl['NetworkAclId'] for acl in network_acls]) if network_acls else 'None'
             network_acl_names = ', '.join([get_tag_value(acl.get('Tags', []), 'Name') for acl in network_acls]) if network_acls else 'None'
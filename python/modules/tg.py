@@ -1,4 +1,12 @@
-from modules.common import exponential_backoff
+from concurrent.futures import ThreadPoolExecutor
+from modules.common import cached_call, chunked
+from modules.fingerprint import ENRICHMENT_CACHE, fingerprint
+
+# describe_target_health 동시 호출 수
+TARGET_HEALTH_WORKERS = 8
+
+# 타겟 헬스는 수시로 바뀌는 상태이므로 헬스체크 주기 수준만 재사용 (연속 Refresh / 다운로드 대상)
+TARGET_HEALTH_MAX_AGE = 60
 
 def get_tag_value(tags, key):
     for tag in tags:
@@ -6,18 +14,75 @@ def get_tag_value(tags, key):
             return tag['Value']
     return '-'
 
+def build_instance_index(session):
+    # Instance ID -> (AZ, Name)
+    instance_index = {}
+    try:
+        instances = cached_call(session, 'ec2', 'describe_instances')
+        for reservation in instances.get('Reservations', []):
+            for instance in reservation.get('Instances', []):
+                instance_index[instance['InstanceId']] = (
+                    instance['Placement']['AvailabilityZone'],
+                    get_tag_value(instance.get('Tags', []), 'Name')
+                )
+    except Exception as e:
+        print(f"Error retrieving instance details: {e}")
+    return instance_index
+
+def build_lb_name_index(session, elbv2_client, lb_arns):
+    # Load Balancer ARN -> Name tag
+    lb_name_index = {}
+    try:
+        load_balancers = cached_call(session, 'elbv2', 'describe_load_balancers')
+        existing_arns = {lb['LoadBalancerArn'] for lb in load_balancers.get('LoadBalancers', [])}
+
+        # describe_tags 는 한 번에 최대 20개 ARN
+        for arns in chunked(sorted(lb_arns & existing_arns), 20):
+            tags = elbv2_client.describe_tags(ResourceArns=arns)
+            for description in tags['TagDescriptions']:
+                lb_name_index[description['ResourceArn']] = get_tag_value(description.get('Tags', []), 'Name')
+    except Exception as e:
+        print(f"Error retrieving load balancer names: {e}")
+    return lb_name_index
+
 def list_target_groups(session):
     elbv2_client = session.client('elbv2')
-    ec2_client = session.client('ec2')
     target_groups_data = []
 
     try:
-        target_groups = exponential_backoff(elbv2_client.describe_target_groups)
-        if 'TargetGroups' not in target_groups or not target_groups['TargetGroups']:
+        target_groups = cached_call(session, 'elbv2', 'describe_target_groups').get('TargetGroups', [])
+        if not target_groups:
             print("No target groups found.")
             return target_groups_data
 
-        for target_group in target_groups['TargetGroups']:
+        instance_index = {}
+        if any(target_group['TargetType'] == 'instance' for target_group in target_groups):
+            instance_index = build_instance_index(session)
+        lb_name_index = build_lb_name_index(
+            session, elbv2_client,
+            {lb_arn for target_group in target_groups for lb_arn in target_group.get('LoadBalancerArns', [])}
+        )
+
+        ENRICHMENT_CACHE.prune(session, 'target-health', [target_group['TargetGroupArn'] for target_group in target_groups])
+
+        def describe_target_health(target_group):
+            try:
+                return ENRICHMENT_CACHE.enrich(
+                    session, 'target-health', target_group['TargetGroupArn'],
+                    fingerprint(target_group, 'TargetGroupArn', 'LoadBalancerArns', 'Port', 'TargetType'),
+                    lambda: elbv2_client.describe_target_health(
+                        TargetGroupArn=target_group['TargetGroupArn']
+                    )['TargetHealthDescriptions'],
+                    max_age=TARGET_HEALTH_MAX_AGE
+                )
+            except Exception as e:
+                print(f"Error retrieving target health for target group {target_group['TargetGroupName']}: {e}")
+                return []
+
+        with ThreadPoolExecutor(max_workers=TARGET_HEALTH_WORKERS) as executor:
+            health_results = list(executor.map(describe_target_health, target_groups))
+
+        for target_group, health_descriptions in zip(target_groups, health_results):
             tg_name = target_group['TargetGroupName']
             tg_protocol = target_group['Protocol']
             tg_target_type = target_group['TargetType']
@@ -30,48 +95,30 @@ def list_target_groups(session):
             tg_health_check_timeout_seconds = target_group.get('HealthCheckTimeoutSeconds', '-')
 
             instance_data = []
-            try:
-                health_descriptions = exponential_backoff(
-                    elbv2_client.describe_target_health,
-                    TargetGroupArn=target_group['TargetGroupArn']
-                )
-                for desc in health_descriptions['TargetHealthDescriptions']:
-                    instance_id = desc['Target']['Id']
-                    health_status = desc['TargetHealth']['State']
-                    zone = '-'
-                    instance_name = "-"
-
-                    if tg_target_type == 'instance':
-                        try:
-                            instance_info = exponential_backoff(
-                                ec2_client.describe_instances,
-                                InstanceIds=[instance_id]
-                            )
-                            for reservation in instance_info['Reservations']:
-                                for instance in reservation['Instances']:
-                                    zone = instance['Placement']['AvailabilityZone']
-                                    instance_name = get_tag_value(instance.get('Tags', []), 'Name')
-                        except Exception as e:
-                            print(f"Error retrieving instance details for instance ID {instance_id}: {e}")
-
-                    instance_data.append({
-                        'Name': tg_name,
-                        'Target Type': tg_target_type,
-                        'Health Status': health_status,
-                        'Instance Name': instance_name,
-                        'Instance ID': instance_id,
-                        'Zone': zone,
-                        'Protocol': tg_protocol,
-                        'Port': tg_port,
-                        'VPC ID': tg_vpc_id,
-                        'Load Balancer Name': '-',  # Placeholder
-                        'Health Check Protocol': tg_health_check_protocol,
-                        'Health Check Path': tg_health_check_path,
-                        'Health Check Timeout Seconds': tg_health_check_timeout_seconds
-                    })
+            for desc in health_descriptions:
+                instance_id = desc['Target']['Id']
+                health_status = desc['TargetHealth']['State']
+                zone = '-'
+                instance_name = "-"
 
-            except Exception as e:
-                print(f"Error retrieving target health for target group {tg_name}: {e}")
+                if tg_target_type == 'instance':
+                    zone, instance_name = instance_index.get(instance_id, ('-', '-'))
+
+                instance_data.append({
+                    'Name': tg_name,
+                    'Target Type': tg_target_type,
+                    'Health Status': health_status,
+                    'Instance Name': instance_name,
+                    'Instance ID': instance_id,
+                    'Zone': zone,
+                    'Protocol': tg_protocol,
+                    'Port': tg_port,
+                    'VPC ID': tg_vpc_id,
+                    'Load Balancer Name': '-',  # Placeholder
+                    'Health Check Protocol': tg_health_check_protocol,
+                    'Health Check Path': tg_health_check_path,
+                    'Health Check Timeout Seconds': tg_health_check_timeout_seconds
+                })
 
             # 추가된 로직: Target이 없는 TG도 포함시키기
             if not instance_data:
@@ -94,23 +141,8 @@ def list_target_groups(session):
             # Load Balancer 이름 매핑
             lb_names = "-"
             if tg_load_balancer_arns:
-                lb_names_list = []
-                for lb_arn in tg_load_balancer_arns:
-                    try:
-                        lb_description = exponential_backoff(
-                            elbv2_client.describe_load_balancers,
-                            LoadBalancerArns=[lb_arn]
-                        )
-                        for lb in lb_description['LoadBalancers']:
-                            tags = exponential_backoff(
-                                elbv2_client.describe_tags,
-                                ResourceArns=[lb_arn]
-                            )
-                            lb_name = get_tag_value(tags['TagDescriptions'][0].get('Tags', []), 'Name')
-                            if lb_name != '-':
-                                lb_names_list.append(lb_name)
-                    except Exception as e:
-                        print(f"Error retrieving load balancer name for ARN {lb_arn}: {e}")
+                lb_names_list = [lb_name_index[lb_arn] for lb_arn in tg_load_balancer_arns
+                                 if lb_name_index.get(lb_arn, '-') != '-']
                 lb_names = ', '.join(lb_names_list)
 
             # Load Balancer 이름 적용
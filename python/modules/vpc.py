@@ -1,15 +1,27 @@
-from modules.common import exponential_backoff
+from modules.common import cached_call
 import ipaddress
 
 def list_vpcs(session):
     vpc_data = []
     try:
         # Get AWS account ID
-        sts_client = session.client('sts')
-        account_id = sts_client.get_caller_identity()["Account"]
+        account_id = cached_call(session, 'sts', 'get_caller_identity')["Account"]
 
-        ec2_client = session.client('ec2')
-        vpcs = exponential_backoff(ec2_client.describe_vpcs)['Vpcs']
+        vpcs = cached_call(session, 'ec2', 'describe_vpcs')['Vpcs']
+
+        # One pass per API, grouped by VPC ID
+        available_ips_by_vpc = {}
+        for subnet in cached_call(session, 'ec2', 'describe_subnets')['Subnets']:
+            available_ips_by_vpc[subnet['VpcId']] = available_ips_by_vpc.get(subnet['VpcId'], 0) + subnet['AvailableIpAddressCount']
+
+        nat_gateways_by_vpc = {}
+        for nat in cached_call(session, 'ec2', 'describe_nat_gateways')['NatGateways']:
+            nat_gateways_by_vpc.setdefault(nat.get('VpcId'), []).append(nat['NatGatewayId'])
+
+        internet_gateways_by_vpc = {}
+        for igw in cached_call(session, 'ec2', 'describe_internet_gateways')['InternetGateways']:
+            for attachment in igw.get('Attachments', []):
+                internet_gateways_by_vpc.setdefault(attachment.get('VpcId'), []).append(igw['InternetGatewayId'])
 
         for vpc in vpcs:
             vpc_id = vpc['VpcId']
@@ -20,31 +32,17 @@ def list_vpcs(session):
             cidr = ipaddress.IPv4Network(cidr_block, strict=False)
             total_ips = cidr.num_addresses - 2  # Subtracting network and broadcast addresses
 
-            # Get subnets in the VPC
-            subnets = exponential_backoff(
-                ec2_client.describe_subnets,
-                Filters=[{'Name': 'vpc-id', 'Values': [vpc_id]}]
-            )['Subnets']
-
             # Calculate available IPs in subnets
-            available_ips = sum(subnet['AvailableIpAddressCount'] for subnet in subnets)
+            available_ips = available_ips_by_vpc.get(vpc_id, 0)
 
             # Find 'Name' tag
             name_tag = next((tag['Value'] for tag in vpc.get('Tags', []) if tag['Key'] == 'Name'), 'Unnamed')
 
             # NAT Gateways
-            nat_gateways = exponential_backoff(
-                ec2_client.describe_nat_gateways,
-                Filters=[{'Name': 'vpc-id', 'Values': [vpc_id]}]
-            )['NatGateways']
-            nat_gateway_ids = ', '.join([nat['NatGatewayId'] for nat in nat_gateways]) if nat_gateways else '-'
+            nat_gateway_ids = ', '.join(nat_gateways_by_vpc.get(vpc_id, [])) or '-'
 
             # Internet Gateways
-            internet_gateways = exponential_backoff(
-                ec2_client.describe_internet_gateways,
-                Filters=[{'Name': 'attachment.vpc-id', 'Values': [vpc_id]}]
-            )['InternetGateways']
-            internet_gateway_ids = ', '.join([igw['InternetGatewayId'] for igw in internet_gateways]) if internet_gateways else '-'
+            internet_gateway_ids = ', '.join(internet_gateways_by_vpc.get(vpc_id, [])) or '-'
 
             # Append the gathered data to the list
             vpc_data.append({
@@ -0,0 +1,46 @@
+import zipfile
+
+# Member listing the files that could not be built
+ERRORS_NAME = 'ERRORS.txt'
+
+class ZipSink:
+    """Write-only, non-seekable file object that hands out the bytes written so far.
+
+    zipfile falls back to data descriptors when its file cannot seek, so an
+    archive can be produced member by member and sent as it grows.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def stream_zip(members, compresslevel=6):
+    """Yield a ZIP_DEFLATED archive of (arcname, bytes) members, one chunk per finished member."""
+    sink = ZipSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as zipf:
+        try:
+            for arc_name, data in members:
+                zipf.writestr(arc_name, data)
+                yield sink.drain()
+        except Exception as e:
+            # The 200 response has already started: record the failure and still close the archive
+            print(f"[ERROR] Download archive stopped early: {e}")
+            zipf.writestr(ERRORS_NAME, f"Archive stopped early: {e}\n")
+    # Central directory
+    yield sink.drain()
@@ -130,5 +130,5 @@ cowsay -f turtle "The AWS Inventory Web Start!" | lolcat
 if [ "$IS_CONTAINER" = "true" ]; then
     /app/inventory_binary
 else
-    python ./python/app.py
+    python ./python/main.py
 fi